@@ -3,20 +3,63 @@
 Manages ingestion and storage of raw API data into Parquet files.
 """
 
+import itertools
 import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from datetime import datetime
-from typing import Dict, List, Optional
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 import polars as pl
-from icecream import ic
+import pyarrow as pa
+import pyarrow.parquet as pq
 
-# Logging configuration
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+from etl_pipeline.config import (
+    BRONZE_DROP_PAGE_CACHE,
+    PARQUET_BATCH_SIZE,
+    PARQUET_COMPRESSION,
+    PARQUET_COMPRESSION_LEVEL,
 )
+from etl_pipeline.utils.files import latest_parquet_file
+
+# Logging is configured by the application entrypoint
 logger = logging.getLogger(__name__)
 
+# Audit columns appended to every bronze snapshot
+AUDIT_FIELDS = [
+    pa.field("_ingestion_timestamp", pa.timestamp('us')),
+    pa.field("_entity_name", pa.dictionary(pa.int32(), pa.string())),
+]
+
+# Suffix of files still being appended to by a persistent writer; readers
+# only look at *.parquet, so they never pick a file without a footer
+IN_PROGRESS_SUFFIX = ".inprogress"
+
+# Snapshot sequence shared by every manager in the process, so two managers
+# ingesting the same entity within one second never build the same name
+_FILE_SEQ = itertools.count()
+
+
+def _drop_page_cache(file_path: str) -> None:
+    """Advise the kernel that a written file will not be re-read soon.
+
+    Dirty pages are scheduled for writeback and clean pages are evicted,
+    leaving the page cache to hotter data. No-op where posix_fadvise is
+    unavailable (e.g. Windows, macOS).
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    
+    try:
+        fd = os.open(file_path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+    except OSError as e:
+        logger.debug("posix_fadvise failed for %s: %s", file_path, e)
+
 
 class BronzeLayerManager:
     """Manager for the Bronze layer.
@@ -28,11 +71,16 @@ class BronzeLayerManager:
     - maintain ingestion history with timestamps
     """
 
-    def __init__(self, base_path: Optional[str] = None):
+    def __init__(self, base_path: Optional[str] = None, persistent_writers: bool = False):
         """Initialize the Bronze layer manager.
 
         Args:
             base_path: base path for storing files. If None, uses the default data/bronze path.
+            persistent_writers: keep one Parquet writer open per entity and append
+                every ingest to it (one file per entity per day) instead of writing
+                a new snapshot per call. Meant for long-running services; an open
+                file is named `*.parquet.inprogress` and only gets its `.parquet`
+                name (and becomes readable) on rotation or `close_writers()`.
         """
         if base_path is None:
             base_path = Path(__file__).parent.parent / "data" / "bronze"
@@ -41,15 +89,29 @@ class BronzeLayerManager:
         
         self.base_path = base_path
         self.base_path.mkdir(parents=True, exist_ok=True)
+        
+        # Last written Arrow schema per entity, reused to skip type inference
+        self._schemas: Dict[str, pa.Schema] = {}
+        # Entity directories already created by ingest_data
+        self._entity_dirs: Dict[str, str] = {}
+        # Open writers in persistent mode: entity -> (writer, file path, day),
+        # each guarded by its entity's lock; _writers_lock only guards the
+        # lock table, so different entities are written concurrently
+        self.persistent_writers = persistent_writers
+        self._writers: Dict[str, Tuple[pq.ParquetWriter, str, date]] = {}
+        self._entity_locks: Dict[str, threading.Lock] = {}
+        self._writers_lock = threading.Lock()
         logger.info(f"Bronze Layer initialized at: {self.base_path}")
 
-    def validate_raw_data(self, data: List) -> bool:
+    def validate_raw_data(self, data: List, schema: Optional[pa.Schema] = None) -> bool:
         # TODO: The extract module already provides validation; keep lightweight checks here.
 
         """Validate raw data received from the API.
 
         Args:
             data: list of dictionaries with raw records
+            schema: if given, the records are also checked against it
+                (see `validate_records`)
 
         Returns:
             bool: True if data is valid
@@ -62,70 +124,366 @@ class BronzeLayerManager:
             logger.error(f"Invalid data type: {type(data)}. Expected list.")
             return False
         
-        logger.info(f"Data validation passed. Records: {len(data) if isinstance(data, list) else 1}")
+        if schema is not None and self.validate_records(data, schema) is None:
+            return False
+        
+        logger.debug("Data validation passed. Records: %d", len(data))
         return True
 
-    def ingest_data(self, data: List, entity_name: str) -> Optional[str]:
+    def validate_records(self, records: List[Dict], schema: pa.Schema) -> Optional[pa.Table]:
+        """Check records against an expected schema, converting them in one batch.
+
+        The whole batch is type-checked by a single Arrow conversion instead of
+        per-record Python checks. Records are rejected when they have keys
+        that are not schema fields, values that do not fit the field types, or
+        missing/null values in fields declared non-nullable.
+
+        Args:
+            records: list of raw records
+            schema: expected record schema (without audit columns)
+
+        Returns:
+            pa.Table with the validated records in `schema`, or None if invalid
+        """
+        extra = set().union(*records) - set(schema.names)
+        if extra:
+            logger.error(f"Invalid data: unexpected fields {sorted(extra)}")
+            return None
+        
+        try:
+            table = pa.Table.from_pylist(records, schema=schema)
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            logger.error(f"Invalid data: records do not match the schema: {e}")
+            return None
+        
+        missing = [
+            field.name for field in schema
+            if not field.nullable and table.column(field.name).null_count
+        ]
+        if missing:
+            logger.error(f"Invalid data: missing or null values in required fields {missing}")
+            return None
+        
+        return table
+
+    def ingest_data(
+        self,
+        data: Union[List, pa.Table],
+        entity_name: str,
+        schema: Optional[pa.Schema] = None
+    ) -> Optional[str]:
         """Ingest raw data and store it as a Parquet file.
 
         Args:
-            data: data payload from the API
+            data: data payload from the API, as a list of records or an Arrow table
             entity_name: entity name (e.g., 'clientes', 'produtos')
+            schema: optional Arrow schema of the record columns (without audit
+                columns). Records are validated against it and converted in
+                one batch (see `validate_records`). When omitted, the schema
+                written for the previous ingest of the entity is reused if the
+                columns still match.
 
         Returns:
             str: saved file path, or None on failure
         """
         try:
-            # Validar dados
-            if not self.validate_raw_data(data):
-                logger.error(f"Data validation failed for entity: {entity_name}")
-                return None
-            
-            # Converter para DataFrame Polars
-            logger.info(f"Converting data to Polars DataFrame for entity: {entity_name}")
+            now = datetime.now()
             
-            # Tratar dados se forem dict com lista dentro
-            if isinstance(data, dict) and 'data' in data:
-                df_data = data['data']
+            if isinstance(data, pa.Table):
+                # Already columnar (e.g. extract_all_endpoints(as_arrow=True))
+                if data.num_rows == 0:
+                    logger.error(f"Data validation failed for entity: {entity_name}")
+                    return None
+                batches = self._iter_table_batches(data, now, entity_name, schema=schema)
             else:
-                df_data = data
+                # Validar dados
+                if not self.validate_raw_data(data):
+                    logger.error(f"Data validation failed for entity: {entity_name}")
+                    return None
             
-            df = pl.DataFrame(df_data)
+                # Converter para lotes Arrow
+                logger.debug("Converting data to Arrow batches for entity: %s", entity_name)
             
-            # Adicionar colunas de auditoria
-            df = df.with_columns([
-                pl.lit(datetime.now()).alias("_ingestion_timestamp"),
-                pl.lit(entity_name).alias("_entity_name"),
-            ])
+                # Tratar dados se forem dict com lista dentro
+                if isinstance(data, dict) and 'data' in data:
+                    df_data = data['data']
+                else:
+                    df_data = data
             
-            # Generate filename
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{entity_name}_raw_{timestamp}.parquet"
-            file_path = self.base_path / entity_name / filename
+                if schema is not None:
+                    # Explicit schema: validated and converted in one batch
+                    table = self.validate_records(df_data, schema)
+                    if table is None:
+                        logger.error(f"Data validation failed for entity: {entity_name}")
+                        return None
+                    batches = self._iter_table_batches(table, now, entity_name)
+                else:
+                    # Column names are the union of keys across records, since
+                    # from_pylist would only look at the first record.
+                    columns = list(dict.fromkeys(key for record in df_data for key in record))
+                    cached_schema = self._schemas.get(entity_name)
+                    from_cache = (
+                        cached_schema is not None
+                        and cached_schema.names[:-len(AUDIT_FIELDS)] == columns
+                    )
+                    batches = self._iter_record_batches(
+                        df_data, columns, now, entity_name,
+                        schema=cached_schema if from_cache else None, from_cache=from_cache
+                    )
             
-            # Criar diretório se não existir
-            file_path.parent.mkdir(parents=True, exist_ok=True)
+            if self.persistent_writers:
+                with self._entity_lock(entity_name):
+                    file_path, n_rows = self._append_to_entity_writer(batches, entity_name, now)
+            else:
+                file_path, n_rows = self._write_snapshot(batches, entity_name, now)
             
-            # Salvar como Parquet com compressão
-            logger.info(f"Saving data to: {file_path}")
-            df.write_parquet(
-                file_path,
-                compression='snappy',
-                use_pyarrow=True
-            )
+            if BRONZE_DROP_PAGE_CACHE and not self.persistent_writers:
+                _drop_page_cache(file_path)
             
             logger.info(
-                f"Successfully ingested {len(df)} records for entity '{entity_name}' "
+                f"Successfully ingested {n_rows} records for entity '{entity_name}' "
                 f"to {file_path}"
             )
             
-            return str(file_path)
+            return file_path
         
         except Exception as e:
-            logger.error(f"Error ingesting data for entity '{entity_name}': {str(e)}")
-            ic(e)
+            logger.exception(f"Error ingesting data for entity '{entity_name}': {str(e)}")
             return None
 
+    def _new_file_path(self, entity_name: str, now: datetime) -> str:
+        """Build a new, unique snapshot path for an entity."""
+        # Second-resolution timestamps can collide when ingests run in
+        # parallel, so pid + the process-wide sequence keep names unique.
+        # Both are zero-padded so names still sort in creation order within
+        # a process (latest_parquet_file orders by name).
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
+        filename = f"{entity_name}_raw_{timestamp}_{os.getpid():07d}_{next(_FILE_SEQ):06d}.parquet"
+        return os.path.join(self._entity_dir(entity_name), filename)
+
+    def _open_writer(self, file_path: str, schema: pa.Schema) -> pq.ParquetWriter:
+        """Open a Parquet writer with the bronze compression settings."""
+        logger.debug("Saving data to: %s", file_path)
+        return pq.ParquetWriter(
+            file_path,
+            schema,
+            compression=PARQUET_COMPRESSION,
+            compression_level=PARQUET_COMPRESSION_LEVEL,
+            # 1 MiB pages line up with OS readahead
+            data_page_size=1 << 20
+        )
+
+    def _write_snapshot(self, batches, entity_name: str, now: datetime) -> Tuple[str, int]:
+        """Write all batches to a new snapshot file.
+
+        Returns:
+            tuple of (file path, number of rows written)
+        """
+        first_batch = next(batches)
+        file_path = self._new_file_path(entity_name, now)
+        writer = self._open_writer(file_path, first_batch.schema)
+        n_rows = 0
+        
+        try:
+            for batch in itertools.chain([first_batch], batches):
+                # One row group per batch: large snapshots get several
+                # ~64k-row groups that downstream readers decode in parallel
+                writer.write_batch(batch, row_group_size=PARQUET_BATCH_SIZE)
+                n_rows += batch.num_rows
+        except Exception:
+            # Do not leave a truncated snapshot behind
+            writer.close()
+            os.unlink(file_path)
+            raise
+        
+        writer.close()
+        self._schemas[entity_name] = first_batch.schema
+        return file_path, n_rows
+
+    def _entity_lock(self, entity_name: str) -> threading.Lock:
+        """Return the lock guarding an entity's persistent writer."""
+        with self._writers_lock:
+            return self._entity_locks.setdefault(entity_name, threading.Lock())
+
+    def _finalize_writer(self, entity_name: str) -> None:
+        """Close an entity's open writer and give its file the final `.parquet` name.
+
+        Must be called with the entity's lock held.
+        """
+        writer, file_path, _ = self._writers.pop(entity_name)
+        writer.close()
+        os.replace(file_path + IN_PROGRESS_SUFFIX, file_path)
+        logger.debug("Closed writer for %s: %s", entity_name, file_path)
+
+    def _append_to_entity_writer(self, batches, entity_name: str, now: datetime) -> Tuple[str, int]:
+        """Append all batches to the entity's open writer, rotating it when needed.
+
+        A new file is started when the day changes or the schema no longer
+        matches the open writer. Must be called with the entity's lock held.
+
+        Returns:
+            tuple of (final file path, number of rows written); the file keeps
+            its in-progress name until the writer is finalized
+        """
+        first_batch = next(batches)
+        entry = self._writers.get(entity_name)
+        
+        if entry is not None:
+            writer, file_path, day = entry
+            if day != now.date() or writer.schema != first_batch.schema:
+                self._finalize_writer(entity_name)
+                entry = None
+        
+        if entry is None:
+            file_path = self._new_file_path(entity_name, now)
+            writer = self._open_writer(file_path + IN_PROGRESS_SUFFIX, first_batch.schema)
+            self._writers[entity_name] = (writer, file_path, now.date())
+        
+        n_rows = 0
+        try:
+            for batch in itertools.chain([first_batch], batches):
+                writer.write_batch(batch, row_group_size=PARQUET_BATCH_SIZE)
+                n_rows += batch.num_rows
+        except Exception:
+            # Row groups already appended stay in the file; start a new one next time
+            self._finalize_writer(entity_name)
+            raise
+        
+        self._schemas[entity_name] = first_batch.schema
+        return file_path, n_rows
+
+    def close_writers(self) -> None:
+        """Close all writers opened in persistent mode, finalizing their files."""
+        with self._writers_lock:
+            entity_names = list(self._writers)
+        
+        for entity_name in entity_names:
+            with self._entity_lock(entity_name):
+                if entity_name in self._writers:
+                    self._finalize_writer(entity_name)
+
+    def _entity_dir(self, entity_name: str) -> str:
+        """Return the entity directory as a string, creating it on first use."""
+        entity_dir = self._entity_dirs.get(entity_name)
+        
+        if entity_dir is None:
+            # Criar diretório se não existir (apenas na primeira ingestão)
+            entity_dir = os.path.join(self.base_path, entity_name)
+            os.makedirs(entity_dir, exist_ok=True)
+            self._entity_dirs[entity_name] = entity_dir
+        
+        return entity_dir
+
+    @staticmethod
+    def _audit_columns(n_rows: int, ingestion_timestamp: datetime, entity_name: str) -> List[pa.Array]:
+        """Build the constant `_ingestion_timestamp` and `_entity_name` columns.
+
+        Both are built directly in Arrow: the timestamp as a repeated scalar and
+        the entity name as a single-entry dictionary, so no per-row Python
+        objects are created.
+        """
+        return [
+            pa.repeat(pa.scalar(ingestion_timestamp, type=pa.timestamp('us')), n_rows),
+            pa.DictionaryArray.from_arrays(
+                pa.repeat(pa.scalar(0, type=pa.int32()), n_rows),
+                pa.array([entity_name])
+            ),
+        ]
+
+    def _build_record_batch(
+        self,
+        records: List[Dict],
+        columns: List[str],
+        audit_columns: List[pa.Array],
+        schema: Optional[pa.Schema] = None
+    ) -> pa.RecordBatch:
+        """Convert a chunk of records into an Arrow batch with the audit columns.
+
+        Args:
+            records: chunk of raw records
+            columns: column names to extract from each record
+            audit_columns: audit arrays from `_audit_columns`, at least as long as `records`
+            schema: schema to enforce; inferred from the values when None
+
+        Returns:
+            pa.RecordBatch with the record columns followed by the audit columns
+        """
+        n_rows = len(records)
+        arrays = {column: [record.get(column) for record in records] for column in columns}
+        
+        # Adicionar colunas de auditoria (zero-copy slices)
+        for field, array in zip(AUDIT_FIELDS, audit_columns):
+            arrays[field.name] = array.slice(0, n_rows)
+        
+        return pa.RecordBatch.from_pydict(arrays, schema=schema)
+
+    def _iter_record_batches(
+        self,
+        records: List[Dict],
+        columns: List[str],
+        ingestion_timestamp: datetime,
+        entity_name: str,
+        schema: Optional[pa.Schema] = None,
+        from_cache: bool = False
+    ) -> Iterator[pa.RecordBatch]:
+        """Yield Arrow batches of PARQUET_BATCH_SIZE records.
+
+        Without a schema, it is inferred from the first batch and enforced on
+        the following ones. A cached schema that no longer fits the first batch
+        is discarded and the types are inferred again.
+        """
+        # Built once per ingest and sliced for every batch
+        audit_columns = self._audit_columns(
+            min(len(records), PARQUET_BATCH_SIZE), ingestion_timestamp, entity_name
+        )
+        
+        for start in range(0, len(records), PARQUET_BATCH_SIZE):
+            chunk = records[start:start + PARQUET_BATCH_SIZE]
+            
+            if start > 0 or not from_cache:
+                batch = self._build_record_batch(
+                    chunk, columns, audit_columns, schema=schema
+                )
+            else:
+                try:
+                    batch = self._build_record_batch(
+                        chunk, columns, audit_columns, schema=schema
+                    )
+                except (pa.ArrowInvalid, pa.ArrowTypeError):
+                    # Types changed since the last ingest: infer again
+                    logger.warning(f"Schema changed for entity '{entity_name}', re-inferring types")
+                    batch = self._build_record_batch(
+                        chunk, columns, audit_columns
+                    )
+            
+            schema = batch.schema
+            yield batch
+
+    def _iter_table_batches(
+        self,
+        table: pa.Table,
+        ingestion_timestamp: datetime,
+        entity_name: str,
+        schema: Optional[pa.Schema] = None
+    ) -> Iterator[pa.RecordBatch]:
+        """Yield batches of an Arrow table with the audit columns appended.
+
+        The table's buffers are reused as-is (zero-copy slices); only the
+        audit columns are allocated.
+        """
+        if schema is not None:
+            table = table.select(schema.names).cast(schema)
+        
+        audit_columns = self._audit_columns(
+            min(table.num_rows, PARQUET_BATCH_SIZE), ingestion_timestamp, entity_name
+        )
+        
+        for batch in table.to_batches(max_chunksize=PARQUET_BATCH_SIZE):
+            arrays = batch.columns + [array.slice(0, batch.num_rows) for array in audit_columns]
+            yield pa.RecordBatch.from_arrays(
+                arrays, schema=pa.schema(list(batch.schema) + AUDIT_FIELDS)
+            )
+
     def ingest_multiple_entities(
         self,
         data_dict: Dict[str, List[Dict]]
@@ -141,14 +499,25 @@ class BronzeLayerManager:
             dict with results per entity
         """
         results = {}
-        
-        for entity_name, data in data_dict.items():
-            logger.info(f"Processing entity: {entity_name}")
 
-            result = self.ingest_data(data, entity_name)
-            results[entity_name] = result
-        
-        return results
+        if not data_dict:
+            return results
+
+        # Entities are independent and ingestion is I/O bound (Parquet
+        # encode + disk write release the GIL), so threads are enough.
+        max_workers = min(len(data_dict), os.cpu_count() or 1)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {}
+            for entity_name, data in data_dict.items():
+                logger.debug("Processing entity: %s", entity_name)
+                futures[executor.submit(self.ingest_data, data, entity_name)] = entity_name
+
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+
+        # Keep the same ordering as the input mapping
+        return {entity_name: results[entity_name] for entity_name in data_dict}
 
     def _get_latest_file(self, entity_name: str) -> Optional[Path]:
         """Return the most recent Parquet file for an entity, or None if missing."""
@@ -158,26 +527,37 @@ class BronzeLayerManager:
             logger.warning(f"No data found for entity: {entity_name}")
             return None
         
-        parquet_files = list(entity_path.glob("*.parquet"))
+        latest = latest_parquet_file(entity_path)
         
-        if not parquet_files:
+        if latest is None:
             logger.warning(f"No parquet files found for entity: {entity_name}")
             return None
         
-        latest_file = max(parquet_files, key=lambda p: p.stat().st_mtime)
-        logger.info(f"Latest file for {entity_name}: {latest_file}")
+        latest_file = Path(latest.path)
+        
+        logger.debug("Latest file for %s: %s", entity_name, latest_file)
         
         return latest_file
 
-    def _read_latest_data(self, entity_name: str) -> Optional[pl.DataFrame]:
-        """Read the latest Parquet file for an entity and return a Polars DataFrame."""
-        latest_file = self._get_latest_file(entity_name)
+    def _read_latest_data(
+        self,
+        entity_name: str,
+        latest_file: Optional[Path] = None
+    ) -> Optional[pl.DataFrame]:
+        """Read the latest Parquet file for an entity and return a Polars DataFrame.
+
+        Args:
+            entity_name: entity folder name
+            latest_file: already resolved latest file, to skip a second directory scan
+        """
+        if latest_file is None:
+            latest_file = self._get_latest_file(entity_name)
         
         if latest_file is None:
             return None
         
         try:
-            logger.info(f"Reading data from: {latest_file}")
+            logger.debug("Reading data from: %s", latest_file)
             df = pl.read_parquet(latest_file)
             logger.info(f"Successfully read {len(df)} records from {latest_file}")
             return df
@@ -188,13 +568,21 @@ class BronzeLayerManager:
 
     def list_entities(self) -> List[str]:
         """List all entity directories in the bronze layer."""
-        entities = [d.name for d in self.base_path.iterdir() if d.is_dir()]
+        # DirEntry.is_dir() uses the d_type returned by the directory read,
+        # avoiding one stat() per entry
+        with os.scandir(self.base_path) as it:
+            entities = sorted(entry.name for entry in it if entry.is_dir())
         logger.info(f"Available entities: {entities}")
-        return sorted(entities)
+        return entities
 
     def get_entity_statistics(self, entity_name: str) -> Dict:
         """Return statistics for the latest file of the specified entity."""
-        df = self._read_latest_data(entity_name)
+        latest_file = self._get_latest_file(entity_name)
+        
+        if latest_file is None:
+            return {}
+        
+        df = self._read_latest_data(entity_name, latest_file)
         
         if df is None:
             return {}
@@ -205,7 +593,7 @@ class BronzeLayerManager:
             "total_columns": len(df.columns),
             "columns": df.columns,
             "last_ingestion": df.select(pl.col("_ingestion_timestamp")).max()[0, 0],
-            "file_size_mb": self._get_latest_file(entity_name).stat().st_size / (1024 * 1024)
+            "file_size_mb": latest_file.stat().st_size / (1024 * 1024)
         }
         
         logger.info(f"Statistics for {entity_name}: {stats}")
@@ -227,16 +615,17 @@ class BronzeLayerManager:
             logger.warning(f"Entity path not found: {entity_path}")
             return 0
         
-        parquet_files = sorted(
-            entity_path.glob("*.parquet"),
-            key=lambda p: p.stat().st_mtime,
-            reverse=True
-        )
+        # Same ordering as _get_latest_file: timestamped names sort chronologically
+        with os.scandir(entity_path) as it:
+            parquet_files = sorted(
+                (entry.path for entry in it if entry.name.endswith(".parquet")),
+                reverse=True
+            )
         
         removed_count = 0
         for file_to_remove in parquet_files[keep_count:]:
             try:
-                file_to_remove.unlink()
+                os.unlink(file_to_remove)
                 logger.info(f"Removed old file: {file_to_remove}")
                 removed_count += 1
             except Exception as e:
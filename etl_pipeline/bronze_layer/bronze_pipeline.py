@@ -4,22 +4,14 @@ Orchestrates API extraction and ingestion into the Bronze layer.
 """
 
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional, List
-import sys
-from icecream import ic
-from pathlib import Path
 
-# Add parent path to import local modules
-sys.path.insert(0, str(Path(__file__).parent.parent))
+from etl_pipeline.bronze_layer.bronze_manager import BronzeLayerManager
+from etl_pipeline.extract.extract_api import extract_all_endpoints_iter, extract_endpoint
 
-from extract.extract_api import extract_all_endpoints
-
-from bronze_layer.bronze_manager import BronzeLayerManager
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Logging is configured by the application entrypoint
 logger = logging.getLogger(__name__)
 
 class BronzePipeline:
@@ -43,15 +35,33 @@ class BronzePipeline:
         """
         logger.info("Starting full extraction pipeline")
         
-        # Extract data from all endpoints
-        extracted_data = extract_all_endpoints()
-
-        # Ingest data into the Bronze layer
-        results = self.bronze_manager.ingest_multiple_entities(extracted_data)
+        # Overlap extraction and ingestion: each endpoint is handed to the
+        # pool as soon as it is fetched, while the next one is downloaded.
+        with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as executor:
+            futures = {
+                entity_name: executor.submit(self.bronze_manager.ingest_data, data, entity_name)
+                for entity_name, data in extract_all_endpoints_iter()
+            }
+        
+        results = {entity_name: future.result() for entity_name, future in futures.items()}
+        # Finalize files left open when the manager runs with persistent writers
+        self.bronze_manager.close_writers()
         
         logger.info("Full extraction pipeline completed")
         return results
     
+    def run_entity_extraction(self, entity_name: str) -> Optional[str]:
+        """Extract a single endpoint and ingest it into the Bronze layer.
+
+        Args:
+            entity_name: endpoint name (a key of ENDPOINTS)
+
+        Returns:
+            path of the ingested file, or None on failure
+        """
+        logger.info("Starting extraction of %s", entity_name)
+        return self.bronze_manager.ingest_data(extract_endpoint(entity_name), entity_name)
+    
     def generate_report(self) -> Dict:
         """Generate a report for the Bronze layer.
 
@@ -96,12 +106,16 @@ class BronzePipeline:
 
 
 if __name__ == '__main__':
+    from etl_pipeline.config import LOG_FORMAT, LOG_LEVEL
+
+    logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
+
     # Example usage
     pipeline = BronzePipeline()
 
     # Option 1: run full extraction
     results = pipeline.run_full_extraction()
-    ic("Extraction results:", results)
+    logger.info(f"Extraction results: {results}")
 
     # Option 2: generate report
     # report = pipeline.generate_report()
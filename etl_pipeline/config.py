@@ -25,6 +25,9 @@ for dir_path in [BRONZE_DIR, SILVER_DIR, GOLD_DIR, LOGS_DIR]:
 API_URL = os.getenv('API_URL', 'https://systock-api.onrender.com/')
 API_TIMEOUT = int(os.getenv('API_TIMEOUT', '30'))
 API_RETRIES = int(os.getenv('API_RETRIES', '3'))
+# Conditional requests (ETag / Last-Modified) against cached responses
+HTTP_CACHE_ENABLED = os.getenv('HTTP_CACHE_ENABLED', 'true').lower() == 'true'
+HTTP_CACHE_DIR = Path(os.getenv('HTTP_CACHE_DIR', DATA_DIR / "raw" / ".cache"))
 
 # Database Configuration
 DB_HOST = os.getenv('DB_HOST', 'localhost')
@@ -34,7 +37,14 @@ DB_USER = os.getenv('DB_USER', 'postgres')
 DB_PASSWORD = os.getenv('DB_PASSWORD', '')
 
 # Parquet Configuration
-PARQUET_COMPRESSION = os.getenv('PARQUET_COMPRESSION', 'snappy')
+PARQUET_COMPRESSION = os.getenv('PARQUET_COMPRESSION', 'zstd')
+PARQUET_COMPRESSION_LEVEL = int(os.getenv('PARQUET_COMPRESSION_LEVEL', '1'))
+# Raw extract files are written once and read many times: compress harder
+RAW_PARQUET_COMPRESSION_LEVEL = int(os.getenv('RAW_PARQUET_COMPRESSION_LEVEL', '3'))
+PARQUET_BATCH_SIZE = int(os.getenv('PARQUET_BATCH_SIZE', '65536'))
+# Drop freshly written bronze files from the OS page cache (Linux only).
+# Off by default because the silver layer reads the latest snapshot right after.
+BRONZE_DROP_PAGE_CACHE = os.getenv('BRONZE_DROP_PAGE_CACHE', 'false').lower() == 'true'
 KEEP_FILES_COUNT = int(os.getenv('KEEP_FILES_COUNT', '5'))
 
 # Logging Configuration
@@ -4,18 +4,32 @@ Módulo de extração de dados da API
 
 from .extract_api import (
     get_data,
+    get_data_async,
+    get_cached_etag,
     extract_all_endpoints,
+    extract_all_endpoints_iter,
+    extract_all_endpoints_async,
+    extract_endpoint,
+    extract_endpoint_async,
     validate_data,
     save_as_parquet,
+    to_arrow,
     ENDPOINTS,
     API_URL
 )
 
 __all__ = [
     "get_data",
+    "get_data_async",
+    "get_cached_etag",
     "extract_all_endpoints",
+    "extract_all_endpoints_iter",
+    "extract_all_endpoints_async",
+    "extract_endpoint",
+    "extract_endpoint_async",
     "validate_data",
     "save_as_parquet",
+    "to_arrow",
     "ENDPOINTS",
     "API_URL"
 ]
@@ -1,21 +1,31 @@
+import asyncio
+import hashlib
+import io
 import os
-import requests
+import random
+import httpx
+import orjson
 import polars as pl
-#import pyarrow
+import pyarrow as pa
+import pyarrow.json as pa_json
+import pyarrow.parquet as pq
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from pathlib import Path
-from requests.exceptions import ConnectionError
-from icecream import ic
-from typing import Dict, Optional, List
+from typing import AsyncIterator, Dict, Iterator, Optional, List, Tuple, Union
 import logging
 
-# Logging configuration
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+from etl_pipeline.config import (
+    HTTP_CACHE_DIR,
+    HTTP_CACHE_ENABLED,
+    PARQUET_COMPRESSION,
+    RAW_PARQUET_COMPRESSION_LEVEL,
 )
+
+# Logging is configured by the application entrypoint
 logger = logging.getLogger(__name__)
 
-# The API supports paginated endpoints
+# The API supports paginated endpoints (see `paginate`)
 API_URL = 'https://systock-api.onrender.com/'
 
 ENDPOINTS = {
@@ -32,64 +42,392 @@ ENDPOINTS = {
     'distribuicao_interna': 'internal-distributions'
 }
 
+# Concurrent requests to the API; all of them share one HTTP/2 connection
+MAX_CONCURRENT_REQUESTS = 16
+FETCH_RETRIES = 3
+# Upper bound on the pages fetched for one endpoint
+MAX_PAGES = 10_000
+# Rows per row group (and per conversion chunk) in raw extract files
+RAW_ROW_GROUP_SIZE = 128_000
+# Records parsed first to find the columns read as strings (see `_records_to_arrow`)
+SCHEMA_SAMPLE_ROWS = 1_000
+# Raw bodies below this size are parsed with orjson instead of Polars
+POLARS_JSON_MIN_BYTES = 64 * 1024
+# Exponential backoff between attempts: base * 2**attempt, capped
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 30.0
+
+
+def _cache_paths(url: str) -> Tuple[Path, Path]:
+    """Paths of the cached validators (.json) and body (.body) for a URL."""
+    key = hashlib.sha1(url.encode()).hexdigest()
+    return HTTP_CACHE_DIR / f"{key}.json", HTTP_CACHE_DIR / f"{key}.body"
+
+
+def _read_cache_entry(url: str) -> Optional[Dict]:
+    """Load the cached validators for a URL, or None if there are none."""
+    if not HTTP_CACHE_ENABLED:
+        return None
+    
+    meta_path, body_path = _cache_paths(url)
+    try:
+        entry = orjson.loads(meta_path.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+    
+    return entry if body_path.exists() else None
+
+
+def _conditional_headers(url: str) -> Dict[str, str]:
+    """Build If-None-Match / If-Modified-Since headers from the cache."""
+    entry = _read_cache_entry(url)
+    if entry is None:
+        return {}
+    
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def _load_cached_body(url: str) -> Optional[bytes]:
+    """Return the cached response body for a URL, or None if missing."""
+    try:
+        return _cache_paths(url)[1].read_bytes()
+    except OSError:
+        return None
+
+
+def _store_response(url: str, headers, content: bytes) -> None:
+    """Cache a response body when the server sent validators for it."""
+    etag = headers.get("ETag")
+    last_modified = headers.get("Last-Modified")
+    if not HTTP_CACHE_ENABLED or not (etag or last_modified):
+        return
+    
+    meta_path, body_path = _cache_paths(url)
+    try:
+        HTTP_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # Write to temporary files and rename so readers never see partial entries
+        for path, payload in (
+            (body_path, content),
+            (meta_path, orjson.dumps({"url": url, "etag": etag, "last_modified": last_modified})),
+        ):
+            tmp_path = path.with_suffix(path.suffix + ".tmp")
+            tmp_path.write_bytes(payload)
+            os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Could not cache response for {url}: {e}")
+
+
+def get_cached_etag(url: str) -> Optional[str]:
+    """Return the ETag of the cached response for a URL, if any.
+
+    Args:
+        url: API URL
+
+    Returns:
+        str ETag, or None when the response is not cached
+    """
+    entry = _read_cache_entry(url)
+    return entry.get("etag") if entry else None
+
+
+def _retry_delay(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    """Seconds to wait before the next attempt.
 
-def get_data(url: str, retries: int = 3) -> Optional[Dict]:
-    """Connect to the API and return JSON data.
+    Honors a `Retry-After` header on 429/503 responses; otherwise uses
+    exponential backoff with full jitter.
+    """
+    if response is not None and response.status_code in (429, 503):
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return min(RETRY_MAX_DELAY, max(0.0, float(retry_after)))
+            except ValueError:
+                try:
+                    retry_at = parsedate_to_datetime(retry_after)
+                    wait = (retry_at - datetime.now(timezone.utc)).total_seconds()
+                    return min(RETRY_MAX_DELAY, max(0.0, wait))
+                except (TypeError, ValueError):
+                    pass
+    
+    delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt)
+    return random.uniform(0, delay)
+
+
+async def _fetch(
+    client: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+    url: str,
+    retries: int = FETCH_RETRIES
+) -> Optional[Dict]:
+    """Fetch one URL asynchronously, retrying transient failures with backoff.
+
+    Connection errors, timeouts, 429 and 5xx responses are retried; other
+    4xx responses are not.
 
     Args:
+        client: shared async HTTP client
+        semaphore: bounds the number of in-flight requests
         url: API URL to request
-        retries: number of retry attempts on failure
+        retries: number of attempts
 
     Returns:
         dict with API response data, or None on failure
     """
     for attempt in range(retries):
+        response = None
         try:
-            logger.info(f"Connecting to API: {url} (attempt {attempt + 1}/{retries})")
+            async with semaphore:
+                logger.info(f"Connecting to API: {url} (attempt {attempt + 1}/{retries})")
+                # Streamed: the body is read once into bytes for orjson, and
+                # is not downloaded at all for 304 and error responses
+                async with client.stream("GET", url, headers=_conditional_headers(url)) as response:
+                    if response.status_code != 304:
+                        response.raise_for_status()
+                        body = await response.aread()
             
-            with requests.Session() as session:
-                response = session.get(url, timeout=30)
-                response.raise_for_status()
-                
-                data = response.json()
-                logger.info(f"Successfully retrieved data from {url}")
-                return data
+            if response.status_code == 304:
+                logger.info(f"Not modified, using cached response for {url}")
+                return orjson.loads(_load_cached_body(url))
+            
+            data = orjson.loads(body)
+            _store_response(url, response.headers, body)
+            logger.info(f"Successfully retrieved data from {url}")
+            return data
         
-        except ConnectionError as conn_err:
-            logger.error(f"Connection error: {conn_err}")
-            ic(conn_err)
-        except requests.HTTPError as http_err:
+        except httpx.HTTPStatusError as http_err:
             logger.error(f"HTTP error: {http_err}")
-            ic(http_err)
-        except requests.Timeout as timeout_err:
-            logger.error(f"Timeout error: {timeout_err}")
-            ic(timeout_err)
+            status = http_err.response.status_code
+            if status != 429 and status < 500:
+                break
+        except httpx.TransportError as transport_err:
+            logger.error(f"Connection error: {transport_err!r}")
         except Exception as e:
             logger.error(f"Unexpected error: {e}")
-            ic(e)
+            break
+        
+        if attempt + 1 < retries:
+            await asyncio.sleep(_retry_delay(attempt, response))
     
-    logger.error(f"Failed to retrieve data from {url} after {retries} attempts")
+    logger.error(f"Failed to retrieve data from {url}")
     return None
 
-def extract_all_endpoints() -> Dict[str, List[Dict]]:
-    """Extract data from all configured endpoints.
+
+def _is_paginated(payload: Optional[Dict]) -> bool:
+    """Whether a response is one page of a larger result.
+
+    Paginated responses carry their records under `data` plus either a
+    `total_pages` count or a `next` page URL.
+    """
+    return (
+        isinstance(payload, dict)
+        and isinstance(payload.get("data"), list)
+        and (bool(payload.get("total_pages")) or bool(payload.get("next")))
+    )
+
+
+async def paginate(
+    client: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+    url: str
+) -> Optional[Dict]:
+    """Fetch every page of an endpoint and merge their records.
+
+    When the first page reports `total_pages`, the remaining pages are
+    requested concurrently (bounded by the semaphore); otherwise the `next`
+    links are followed. Non-paginated responses are returned unchanged.
 
     Returns:
-        mapping of {endpoint_name: data}
+        dict with all records under `data`, or None if any page failed, a
+        `next` link points back to an earlier page or there are more than
+        MAX_PAGES pages
     """
-    extracted_data = {}
+    first_page = await _fetch(client, semaphore, url)
+    if not _is_paginated(first_page):
+        return first_page
     
-    for entity_name, endpoint in ENDPOINTS.items():
-        url = f"{API_URL}{endpoint}"
-        logger.info(f"Extracting data from endpoint: {entity_name}")
-        
-        data = get_data(url)
-        extracted_data[entity_name] = data
+    records = list(first_page["data"])
+    total_pages = first_page.get("total_pages")
+    
+    if total_pages:
+        if int(total_pages) > MAX_PAGES:
+            logger.error(f"{url} reports {total_pages} pages, more than MAX_PAGES ({MAX_PAGES})")
+            return None
+        pages = await asyncio.gather(*(
+            _fetch(client, semaphore, str(httpx.URL(url).copy_merge_params({"page": page})))
+            for page in range(2, int(total_pages) + 1)
+        ))
+    else:
+        pages = []
+        seen = {url}
+        next_url = first_page.get("next")
+        while next_url:
+            if next_url in seen or len(seen) >= MAX_PAGES:
+                logger.error(f"Stopping pagination of {url}: {next_url} repeats a page or exceeds MAX_PAGES")
+                return None
+            seen.add(next_url)
+            page = await _fetch(client, semaphore, next_url)
+            pages.append(page)
+            next_url = page.get("next") if isinstance(page, dict) else None
+    
+    for page in pages:
+        if not isinstance(page, dict) or not isinstance(page.get("data"), list):
+            logger.error(f"Incomplete pagination for {url}")
+            return None
+        records.extend(page["data"])
+    
+    logger.info(f"Fetched {len(pages) + 1} pages ({len(records)} records) from {url}")
+    return {"data": records}
+
+
+def _new_client() -> httpx.AsyncClient:
+    """Async HTTP/2 client allowing MAX_CONCURRENT_REQUESTS connections."""
+    limits = httpx.Limits(max_connections=MAX_CONCURRENT_REQUESTS)
+    return httpx.AsyncClient(http2=True, timeout=30, limits=limits)
+
+
+async def _fetch_entity(
+    client: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+    entity_name: str,
+    endpoint: str
+) -> Tuple[str, Optional[Dict]]:
+    logger.info(f"Extracting data from endpoint: {entity_name}")
+    return entity_name, await paginate(client, semaphore, f"{API_URL}{endpoint}")
+
+
+async def extract_all_endpoints_async() -> AsyncIterator[Tuple[str, Optional[Dict]]]:
+    """Extract data from all configured endpoints concurrently.
+
+    All requests are multiplexed over a single HTTP/2 connection, with at
+    most MAX_CONCURRENT_REQUESTS in flight.
+
+    Yields:
+        (endpoint_name, data) tuples, in completion order
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    
+    async with _new_client() as client:
+        tasks = [
+            asyncio.ensure_future(_fetch_entity(client, semaphore, entity_name, endpoint))
+            for entity_name, endpoint in ENDPOINTS.items()
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+async def extract_endpoint_async(entity_name: str) -> Optional[Dict]:
+    """Extract every page of a single configured endpoint.
+
+    Args:
+        entity_name: endpoint name (a key of ENDPOINTS)
+
+    Returns:
+        dict with API response data, or None on failure
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
     
-    return extracted_data
+    async with _new_client() as client:
+        _, data = await _fetch_entity(client, semaphore, entity_name, ENDPOINTS[entity_name])
+    return data
+
+
+async def get_data_async(url: str) -> Optional[Dict]:
+    """Fetch every page of an API URL (see `paginate`).
+
+    Args:
+        url: API URL to request
+
+    Returns:
+        dict with API response data, or None on failure
+    """
+    async with _new_client() as client:
+        return await paginate(client, asyncio.Semaphore(MAX_CONCURRENT_REQUESTS), url)
+
+
+def get_data(url: str) -> Optional[Dict]:
+    """Synchronous wrapper around `get_data_async`.
 
+    Uses the same retries, backoff and response cache as the endpoint extraction.
 
-def validate_data(data: Dict) -> bool:
+    Args:
+        url: API URL to request
+
+    Returns:
+        dict with API response data, or None on failure
+    """
+    return asyncio.run(get_data_async(url))
+
+
+def extract_endpoint(entity_name: str) -> Optional[Dict]:
+    """Synchronous wrapper around `extract_endpoint_async`.
+
+    Used where each entity is extracted by its own task, so downstream work
+    on one entity does not wait for every endpoint.
+    """
+    return asyncio.run(extract_endpoint_async(entity_name))
+
+
+def extract_all_endpoints_iter() -> Iterator[Tuple[str, Optional[Dict]]]:
+    """Synchronous wrapper around `extract_all_endpoints_async`.
+
+    Yields each endpoint as soon as its response is available, so callers
+    can start processing it while the other endpoints are still being fetched.
+
+    Yields:
+        (endpoint_name, data) tuples, in completion order
+    """
+    loop = asyncio.new_event_loop()
+    results = extract_all_endpoints_async()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(results.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        loop.run_until_complete(results.aclose())
+        loop.close()
+
+
+def to_arrow(data: Union[Dict, List[Dict]]) -> pa.Table:
+    """Convert an API payload (records, or a dict with them under `data`) to an Arrow table."""
+    if isinstance(data, dict) and 'data' in data:
+        data = data['data']
+    if isinstance(data, list):
+        return _records_to_arrow(data)
+    # Any other payload (e.g. a dict of columns) is converted by Polars, as before
+    return pl.DataFrame(data).to_arrow()
+
+
+def extract_all_endpoints(as_arrow: bool = False) -> Dict[str, Union[List[Dict], pa.Table, None]]:
+    """Extract data from all configured endpoints.
+
+    Args:
+        as_arrow: return each endpoint as a columnar Arrow table instead of
+            parsed JSON; both the bronze layer and `save_as_parquet` accept it
+
+    Returns:
+        mapping of {endpoint_name: data}, in ENDPOINTS order
+    """
+    results = dict(extract_all_endpoints_iter())
+    if as_arrow:
+        results = {
+            entity_name: to_arrow(data) if data else None
+            for entity_name, data in results.items()
+        }
+    return {entity_name: results[entity_name] for entity_name in ENDPOINTS}
+
+
+def validate_data(data: Union[Dict, pa.Table]) -> bool:
     """Validate that extracted data matches the expected format.
 
     Args:
@@ -98,6 +436,12 @@ def validate_data(data: Dict) -> bool:
     Returns:
         bool: True if valid
     """
+    if isinstance(data, pa.Table):
+        if data.num_rows == 0:
+            logger.warning("Empty data received")
+            return False
+        return True
+    
     if not data:
         logger.warning("Empty data received")
         return False
@@ -110,18 +454,204 @@ def validate_data(data: Dict) -> bool:
     return True
 
 
-def save_as_parquet(data: Dict, filename: str, output_dir: Optional[str] = None) -> Optional[str]:
-    """Save data as a Parquet file with Snappy compression.
+def _read_ndjson(body: bytes, string_columns: List[str]) -> pa.Table:
+    """Parse NDJSON with `pyarrow.json`, reading `string_columns` as strings."""
+    return pa_json.read_json(
+        io.BytesIO(body),
+        read_options=pa_json.ReadOptions(use_threads=True, block_size=8 << 20),
+        parse_options=pa_json.ParseOptions(
+            explicit_schema=pa.schema([(name, pa.string()) for name in string_columns]),
+            unexpected_field_behavior="infer",
+        ),
+    )
+
+
+def _timestamp_columns(table: pa.Table) -> List[str]:
+    """Columns `pyarrow.json` inferred as timestamps (they were ISO strings)."""
+    return [field.name for field in table.schema if pa.types.is_timestamp(field.type)]
+
+
+def _records_to_arrow(records: List[Dict]) -> pa.Table:
+    """Convert records to an Arrow table with the multi-threaded JSON reader.
+
+    Records are serialized to newline-delimited JSON with orjson and parsed
+    by `pyarrow.json`, so no intermediate Python columns are built.
+
+    `pyarrow.json` turns ISO-8601 strings into timestamps, but only while every
+    value parses (e.g. none has fractional seconds), so a column's type would
+    change from run to run. Columns it infers as timestamps from a sample of
+    the records are read as strings instead, as Polars kept them.
+    """
+    head = records[:SCHEMA_SAMPLE_ROWS]
+    sample = _read_ndjson(b"\n".join(orjson.dumps(record) for record in head), [])
+    string_columns = _timestamp_columns(sample)
+    if len(head) == len(records) and not string_columns:
+        return sample
+
+    body = b"\n".join(orjson.dumps(record) for record in records)
+    table = _read_ndjson(body, string_columns)
+    late_columns = _timestamp_columns(table)
+    if late_columns:
+        # Columns that were null throughout the sample
+        string_columns += late_columns
+        table = _read_ndjson(body, string_columns)
+
+    # Explicitly typed columns come first; restore the records' column order
+    order = sample.column_names + [
+        name for name in table.column_names if name not in set(sample.column_names)
+    ]
+    return table.select(order)
+
+
+def _conform_to_schema(table: pa.Table, schema: pa.Schema) -> pa.Table:
+    """Align a chunk with the file schema: reorder, add missing columns as nulls, cast."""
+    unexpected = set(table.column_names) - set(schema.names)
+    if unexpected:
+        raise pa.ArrowInvalid(f"unexpected columns {sorted(unexpected)}")
+    
+    columns = [
+        table.column(field.name).cast(field.type)
+        if field.name in table.column_names
+        else pa.nulls(table.num_rows, field.type)
+        for field in schema
+    ]
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+def _stream_to_parquet(
+    records: List[Dict],
+    file_path: Path,
+    metadata: Optional[Dict[str, str]],
+    write_options: Dict
+) -> int:
+    """Convert and write records one row group at a time.
+
+    Only one chunk of RAW_ROW_GROUP_SIZE records is held as NDJSON and Arrow
+    at any moment. The first chunk fixes the schema; a later chunk that does
+    not fit it raises an Arrow error.
+
+    Returns:
+        int: number of rows written
+    """
+    writer = None
+    n_rows = 0
+    try:
+        for start in range(0, len(records), RAW_ROW_GROUP_SIZE):
+            table = _records_to_arrow(records[start:start + RAW_ROW_GROUP_SIZE])
+            if writer is None:
+                table = table.replace_schema_metadata(metadata)
+                writer = pq.ParquetWriter(file_path, table.schema, **write_options)
+            else:
+                table = _conform_to_schema(table, writer.schema)
+            writer.write_table(table, row_group_size=RAW_ROW_GROUP_SIZE)
+            n_rows += table.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if writer is None:
+        # No records: still write an (empty) file, like a non-streamed write
+        pq.write_table(pa.table({}).replace_schema_metadata(metadata), file_path, **write_options)
+    return n_rows
+
+
+def _parse_body(body: bytes) -> Union[Dict, pa.Table]:
+    """Parse a raw response body for `save_as_parquet`.
+
+    Large bodies are parsed by Polars' multi-threaded reader straight into
+    columns: JSON arrays, `{'data': [...]}` objects (the API's response
+    shape, exploded into one row per record) and NDJSON. Small bodies and
+    objects of other shapes go through orjson, where setup cost would
+    dominate. A small JSON array is wrapped as `{'data': [...]}`, so every
+    body passes `validate_data` the same way.
+    """
+    if len(body) < POLARS_JSON_MIN_BYTES:
+        parsed = orjson.loads(body)
+        return {'data': parsed} if isinstance(parsed, list) else parsed
+
+    try:
+        # Infer from every record, so fields that only appear late are kept
+        frame = pl.read_json(io.BytesIO(body), infer_schema_length=None)
+    except pl.exceptions.ComputeError:
+        # Several top-level documents: newline-delimited JSON
+        return pl.read_ndjson(io.BytesIO(body), infer_schema_length=None).to_arrow()
+
+    if body.lstrip()[:1] == b"[":
+        return frame.to_arrow()
+
+    records = frame.schema.get("data")
+    if isinstance(records, pl.List) and isinstance(records.inner, pl.Struct):
+        return frame.select(pl.col("data").explode()).unnest("data").to_arrow()
+
+    return orjson.loads(body)
+
+
+def _write_partitioned(
+    data: Union[List[Dict], pa.Table],
+    dataset_dir: Path,
+    date_column: str,
+    write_options: Dict
+) -> int:
+    """Write records as a dataset partitioned by year/month of `date_column`.
+
+    Partitions present in `data` replace the existing ones; the others are
+    left untouched, so each run only rewrites the months it received.
+
+    Returns:
+        int: number of rows written
+    """
+    table = data if isinstance(data, pa.Table) else _records_to_arrow(data)
+
+    dates = pl.from_arrow(table.column(date_column))
+    if dates.dtype == pl.String:
+        dates = dates.str.to_datetime(strict=False)
+
+    table = (
+        table
+        .append_column("year", dates.dt.year().to_arrow())
+        .append_column("month", dates.dt.month().to_arrow())
+    )
+    pq.write_to_dataset(
+        table,
+        dataset_dir,
+        partition_cols=["year", "month"],
+        existing_data_behavior="delete_matching",
+        **write_options
+    )
+    return table.num_rows
+
+
+def save_as_parquet(
+    data: Union[Dict, List[Dict], bytes, pa.Table],
+    filename: str,
+    output_dir: Optional[str] = None,
+    etag: Optional[str] = None,
+    compression: Optional[str] = None,
+    partition_date_column: Optional[str] = None
+) -> Optional[str]:
+    """Save data as a Parquet file, converting it to Arrow with `pyarrow.json`.
 
     Args:
-        data: dictionary with data to save
+        data: data to save: parsed JSON, the raw JSON response body, or an
+            Arrow table (written as-is)
         filename: output filename (without extension)
         output_dir: output directory; defaults to `etl_pipeline/data/raw`
+        etag: upstream ETag of the data (see `get_cached_etag`). It is stored in
+            the file metadata, and the write is skipped when the existing file
+            already holds the same ETag.
+        compression: codec override (e.g. 'snappy' for older readers); defaults
+            to PARQUET_COMPRESSION at RAW_PARQUET_COMPRESSION_LEVEL
+        partition_date_column: when set, write a `<filename>/year=YYYY/month=MM/`
+            dataset partitioned by this date column instead of a single file,
+            replacing only the months present in `data`
 
     Returns:
         str: saved file path, or None on failure
     """
     try:
+        if isinstance(data, (bytes, bytearray)):
+            data = _parse_body(data)
+
         # Validar dados
         if not validate_data(data):
             logger.error(f"Data validation failed for {filename}")
@@ -135,42 +665,85 @@ def save_as_parquet(data: Dict, filename: str, output_dir: Optional[str] = None)
 
         output_dir.mkdir(parents=True, exist_ok=True)
 
+        # Definir caminho do arquivo
+        file_path = output_dir / f"{filename}.parquet"
+
+        # Upstream data unchanged: keep the existing file
+        if etag and file_path.exists() and pl.read_parquet_metadata(file_path).get("etag") == etag:
+            logger.info(f"ETag unchanged, skipping write of {file_path}")
+            return str(file_path)
+
         # Extrair dados se estiverem em estrutura nested
         if isinstance(data, dict) and 'data' in data:
             df_data = data['data']
         else:
             df_data = data
+        if not isinstance(df_data, (list, pa.Table)):
+            df_data = to_arrow(df_data)
 
-        # Converter para DataFrame Polars
-        logger.info(f"Converting data to Polars DataFrame")
-        df = pl.DataFrame(df_data)
+        if compression is None:
+            compression = PARQUET_COMPRESSION
+        # Only some codecs take a level (snappy/lz4 reject one)
+        compression_level = (
+            RAW_PARQUET_COMPRESSION_LEVEL if compression in ("zstd", "gzip", "brotli") else None
+        )
+        write_options = dict(
+            compression=compression,
+            compression_level=compression_level,
+            use_dictionary=True,
+            write_statistics=True
+        )
+        metadata = {"etag": etag} if etag else None
 
-        # Definir caminho do arquivo
-        file_path = output_dir / f"{filename}.parquet"
+        if partition_date_column:
+            dataset_dir = output_dir / filename
+            logger.info(f"Saving partitioned parquet dataset: {dataset_dir}")
+            n_rows = _write_partitioned(df_data, dataset_dir, partition_date_column, write_options)
+            logger.info(f"Successfully saved {n_rows} records to {dataset_dir}")
+            return str(dataset_dir)
 
-        # Salvar como Parquet
+        # Write next to the target and rename, so a failed write never
+        # leaves a truncated file behind
+        tmp_path = file_path.with_suffix(".parquet.tmp")
         logger.info(f"Saving parquet file: {file_path}")
-        df.write_parquet(
-            file_path,
-            compression='snappy',
-            use_pyarrow=True
-        )
+        try:
+            try:
+                if isinstance(df_data, pa.Table):
+                    table = df_data.replace_schema_metadata(metadata)
+                    pq.write_table(table, tmp_path, row_group_size=RAW_ROW_GROUP_SIZE, **write_options)
+                    n_rows = table.num_rows
+                else:
+                    n_rows = _stream_to_parquet(df_data, tmp_path, metadata, write_options)
+            except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as e:
+                # Later chunks do not fit the first chunk's schema: convert at once
+                logger.warning(f"Schema varies across chunks of {filename} ({e}), converting in one pass")
+                table = _records_to_arrow(df_data).replace_schema_metadata(metadata)
+                pq.write_table(table, tmp_path, row_group_size=RAW_ROW_GROUP_SIZE, **write_options)
+                n_rows = table.num_rows
+            os.replace(tmp_path, file_path)
+        finally:
+            # Gone after a successful rename; left over only when a write failed
+            tmp_path.unlink(missing_ok=True)
 
-        logger.info(f"Successfully saved {len(df)} records to {file_path}")
+        logger.info(f"Successfully saved {n_rows} records to {file_path}")
         return str(file_path)
 
     except Exception as e:
         logger.error(f"Error saving parquet file {filename}: {str(e)}")
-        ic(e)
+        logger.debug("%r", e)
         return None
 
 
 if __name__ == '__main__':
+    from etl_pipeline.config import LOG_FORMAT, LOG_LEVEL
+
+    logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
     logger.info("Starting API extraction")
 
     # Example usage (uncomment to run locally):
     # data = get_data(API_URL + 'clients')
     # save_as_parquet({'clients': data}, 'raw_clients')
 
-    ic(extract_all_endpoints())
+    for entity_name, data in extract_all_endpoints().items():
+        logger.info(f"{entity_name}: {'ok' if data is not None else 'failed'}")
     logger.info("API extraction completed")
\ No newline at end of file
@@ -1,9 +1,17 @@
+import io
+import logging
+import threading
 import polars as pl
-import psycopg2
+from contextlib import contextmanager
+from datetime import date
 from pathlib import Path
 from dataclasses import dataclass, field
-from psycopg2.extras import execute_values
-from icecream import ic
+from psycopg2.pool import ThreadedConnectionPool
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from silver_layer.transformations import tempo_attributes
+
+logger = logging.getLogger(__name__)
 
 DB_CONFIG = {
     "host": "localhost",
@@ -13,17 +21,354 @@ DB_CONFIG = {
     "password": "postgres"
 }
 
+# Rows sent per COPY chunk; bounds the size of the in-memory CSV buffer
+COPY_CHUNK_ROWS = 65_536
+# Bytes handed to libpq per read of the COPY buffer (psycopg2 default: 8 KiB)
+COPY_READ_SIZE = 1 << 20
+
+# Connection pools shared by all loaders, one per database config
+POOL_MIN_CONN = 1
+POOL_MAX_CONN = 8
+_POOLS: Dict[Tuple, ThreadedConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_pool(db_config: dict) -> ThreadedConnectionPool:
+    """Return the connection pool for a database config, creating it on first use."""
+    key = tuple(sorted(db_config.items()))
+
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = ThreadedConnectionPool(POOL_MIN_CONN, POOL_MAX_CONN, **db_config)
+            _POOLS[key] = pool
+
+    return pool
+
+
+def close_pools():
+    """Close every pooled connection. Call once when the pipeline shuts down."""
+    with _POOLS_LOCK:
+        for pool in _POOLS.values():
+            pool.closeall()
+        _POOLS.clear()
+
+
+def _copy_statement(table: str, columns: List[str]) -> str:
+    """COPY FROM STDIN statement (CSV) for `columns` of `table`."""
+    return f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT CSV)"
+
+
+class UpsertStatements(NamedTuple):
+    create_staging: str
+    copy: str
+    merge: str
+
+
+def _upsert_statements(
+    table: str,
+    columns: List[str],
+    conflict_key: str,
+    on_conflict: str
+) -> UpsertStatements:
+    """Build the staging-table upsert SQL for a target table.
+
+    Rows are copied into a temporary staging table and merged with a single
+    INSERT ... SELECT ... ON CONFLICT. Rows repeating a key are collapsed
+    first (the last one copied wins), since one statement may not update the
+    same target row twice.
+
+    Args:
+        table: target table
+        columns: target columns
+        conflict_key: unique column the merge is keyed on
+        on_conflict: action applied on key conflicts (DO UPDATE ... / DO NOTHING)
+    """
+    staging = f"stg_{table.split('.')[-1]}"
+    column_list = ", ".join(columns)
+
+    return UpsertStatements(
+        # _seq numbers rows in COPY order so duplicates resolve to the latest one
+        create_staging=(
+            f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS "
+            f"SELECT {column_list} FROM {table} WITH NO DATA; "
+            f"ALTER TABLE {staging} ADD COLUMN _seq BIGSERIAL"
+        ),
+        copy=_copy_statement(staging, columns),
+        merge=(
+            f"INSERT INTO {table} ({column_list}) "
+            f"SELECT DISTINCT ON ({conflict_key}) {column_list} FROM {staging} "
+            f"ORDER BY {conflict_key}, _seq DESC "
+            f"ON CONFLICT ({conflict_key}) {on_conflict.strip()}"
+        ),
+    )
+
+
+# Loader statements, built once at import
+
+# silver column -> target column
+DIM_TEMPO_COLUMNS = {
+    "id_tempo": "id_tempo",
+    "data_completa": "data_completa",
+    "ano": "ano",
+    "mes": "mes",
+    "dia": "dia",
+    "trimestre": "trimestre",
+    "semana": "semana",
+    "dia_semana": "dia_semana",
+    "eh_fim_semana": "eh_fim_semana",
+}
+DIM_TEMPO_UPSERT = _upsert_statements(
+    "analytics.dim_tempo",
+    list(DIM_TEMPO_COLUMNS.values()),
+    "id_tempo",
+    "DO NOTHING"
+)
+
+# silver column -> target column
+DIM_CLIENTE_COLUMNS = {
+    "id_cliente": "id_cliente_api",
+    "nome_cliente": "nome_cliente",
+    "cpf_cnpj": "cpf_cnpj",
+    "email": "email",
+    "telefone": "telefone",
+    "endereco": "endereco",
+    "tipo_cliente": "tipo_cliente",
+    "data_carga": "data_carga",
+}
+DIM_CLIENTE_UPSERT = _upsert_statements(
+    "analytics.dim_cliente",
+    list(DIM_CLIENTE_COLUMNS.values()),
+    "id_cliente_api",
+    """
+    DO UPDATE SET
+        nome_cliente = EXCLUDED.nome_cliente,
+        email = EXCLUDED.email,
+        telefone = EXCLUDED.telefone,
+        endereco = EXCLUDED.endereco,
+        tipo_cliente = EXCLUDED.tipo_cliente,
+        data_carga = EXCLUDED.data_carga
+    """
+)
+
+# silver column -> target column
+DIM_LOJA_COLUMNS = {
+    "id_loja": "id_loja_api",
+    "nome_loja": "nome_loja",
+    "endereco_loja": "endereco_loja",
+    "data_carga": "data_carga",
+}
+DIM_LOJA_UPSERT = _upsert_statements(
+    "analytics.dim_loja",
+    list(DIM_LOJA_COLUMNS.values()),
+    "id_loja_api",
+    """
+    DO UPDATE SET
+        nome_loja = EXCLUDED.nome_loja,
+        endereco_loja = EXCLUDED.endereco_loja,
+        data_carga = EXCLUDED.data_carga
+    """
+)
+
+# silver column -> target column
+DIM_PRODUTO_COLUMNS = {
+    "id_produto": "id_produto_api",
+    "nome_produto": "nome_produto",
+    "descricao_produto": "descricao_produto",
+    "id_categoria": "id_categoria",
+    "preco_venda": "preco_venda",
+    "custo_fornecedor": "custo_fornecedor",
+    "ativo": "ativo",
+    "nome_categoria": "nome_categoria",
+    "descricao_categoria": "descricao_categoria",
+}
+DIM_PRODUTO_UPSERT = _upsert_statements(
+    "analytics.dim_produto",
+    list(DIM_PRODUTO_COLUMNS.values()),
+    "id_produto_api",
+    """
+    DO UPDATE SET
+        nome_produto = EXCLUDED.nome_produto,
+        descricao_produto = EXCLUDED.descricao_produto,
+        id_categoria = EXCLUDED.id_categoria,
+        preco_venda = EXCLUDED.preco_venda,
+        custo_fornecedor = EXCLUDED.custo_fornecedor,
+        ativo = EXCLUDED.ativo,
+        nome_categoria = EXCLUDED.nome_categoria,
+        descricao_categoria = EXCLUDED.descricao_categoria
+    """
+)
+
+# silver column -> target column
+FATO_ESTOQUE_COLUMNS = {
+    "id_estoque": "id_estoque_api",
+    "id_tempo": "id_tempo",
+    "id_loja": "id_loja",
+    "id_produto": "id_produto",
+    "quantidade_inicial": "quantidade_inicial",
+    "quantidade_final": "quantidade_final",
+    "valor_inicial": "valor_estoque_inicial",
+    "valor_final": "valor_estoque_final",
+    "entrada": "entradas",
+    "saida": "saidas",
+    "data_carga": "data_carga",
+}
+FATO_ESTOQUE_UPSERT = _upsert_statements(
+    "analytics.fato_estoque",
+    list(FATO_ESTOQUE_COLUMNS.values()),
+    "id_estoque_api",
+    """
+    DO UPDATE SET
+        id_tempo = EXCLUDED.id_tempo,
+        id_loja = EXCLUDED.id_loja,
+        id_produto = EXCLUDED.id_produto,
+        quantidade_inicial = EXCLUDED.quantidade_inicial,
+        quantidade_final = EXCLUDED.quantidade_final,
+        valor_estoque_inicial = EXCLUDED.valor_estoque_inicial,
+        valor_estoque_final = EXCLUDED.valor_estoque_final,
+        entradas = EXCLUDED.entradas,
+        saidas = EXCLUDED.saidas,
+        data_carga = EXCLUDED.data_carga
+
+    WHERE analytics.fato_estoque.data_carga < EXCLUDED.data_carga
+    """
+)
+
+# silver column -> target column
+FATO_VENDAS_COLUMNS = {
+    "id_venda": "id_venda_api",
+    "id_tempo": "id_tempo",
+    "id_loja": "id_loja",
+    "id_cliente": "id_cliente",
+    "id_produto": "id_produto",
+    "quantidade": "quantidade",
+    "valor_unitario": "valor_unitario",
+    "custo_unitario": "custo_unitario",
+    "valor_total": "valor_total",
+    "custo_total": "custo_total",
+    "lucro": "lucro",
+    "margem_lucro": "margem_lucro",
+    "data_carga": "data_carga",
+}
+FATO_VENDAS_UPSERT = _upsert_statements(
+    "analytics.fato_vendas",
+    list(FATO_VENDAS_COLUMNS.values()),
+    "id_venda_api",
+    """
+    DO UPDATE SET
+        id_tempo = EXCLUDED.id_tempo,
+        id_loja = EXCLUDED.id_loja,
+        id_cliente = EXCLUDED.id_cliente,
+        id_produto = EXCLUDED.id_produto,
+        quantidade = EXCLUDED.quantidade,
+        valor_unitario = EXCLUDED.valor_unitario,
+        custo_unitario = EXCLUDED.custo_unitario,
+        valor_total = EXCLUDED.valor_total,
+        custo_total = EXCLUDED.custo_total,
+        lucro = EXCLUDED.lucro,
+        margem_lucro = EXCLUDED.margem_lucro,
+        data_carga = EXCLUDED.data_carga
+
+    WHERE analytics.fato_vendas.data_carga < EXCLUDED.data_carga
+    """
+)
+
+# silver column -> target column
+FATO_DISTRIBUICOES_COLUMNS = {
+    "id_distribuicao": "id_distribuicao_api",
+    "id_loja_origem": "id_loja_origem",
+    "id_loja_destino": "id_loja_destino",
+    "id_tempo": "id_tempo",
+    "id_produto": "id_produto",
+    "quantidade": "quantidade",
+    "status_distribuicao": "status",
+    "data_carga": "data_carga",
+}
+FATO_DISTRIBUICOES_UPSERT = _upsert_statements(
+    "analytics.fato_distribuicoes",
+    list(FATO_DISTRIBUICOES_COLUMNS.values()),
+    "id_distribuicao_api",
+    """
+    DO UPDATE SET
+        id_loja_origem = EXCLUDED.id_loja_origem,
+        id_loja_destino = EXCLUDED.id_loja_destino,
+        id_tempo = EXCLUDED.id_tempo,
+        id_produto = EXCLUDED.id_produto,
+        quantidade = EXCLUDED.quantidade,
+        status = EXCLUDED.status,
+        data_carga = EXCLUDED.data_carga
+
+    WHERE analytics.fato_distribuicoes.data_carga < EXCLUDED.data_carga
+    """
+)
+
+
+def build_dim_tempo(start: date, end: date) -> pl.DataFrame:
+    """Build one dim_tempo row per day between start and end (inclusive).
+
+    Attributes come from the silver `tempo_attributes`, as in transform_tempo.
+    """
+    return (
+        pl.date_range(start, end, "1d", eager=True)
+        .to_frame("data")
+        .select(tempo_attributes(pl.col("data")))
+        .select(list(DIM_TEMPO_COLUMNS))
+    )
+
+
+# (column, operator, value) predicates, as in pyarrow's `filters`
+Filter = Tuple[str, str, Any]
+
+_FILTER_OPS = {
+    "=": lambda col, value: col == value,
+    "==": lambda col, value: col == value,
+    "!=": lambda col, value: col != value,
+    "<": lambda col, value: col < value,
+    "<=": lambda col, value: col <= value,
+    ">": lambda col, value: col > value,
+    ">=": lambda col, value: col >= value,
+    "in": lambda col, value: col.is_in(list(value)),
+}
+
+
 @dataclass
 class ReadSilverParquet:
     silver_dir: Path = field(repr=False)
 
-    def read(self, entity_name: str) -> pl.DataFrame:
+    def read(
+        self,
+        entity_name: str,
+        columns: Optional[List[str]] = None,
+        filters: Optional[List[Filter]] = None
+    ) -> pl.DataFrame:
+        """Read a silver table.
+
+        The table is either `<entity>.parquet` or a hive-partitioned directory
+        `<entity>/year=YYYY/month=MM/...`. Projection and filters are pushed
+        down into the Parquet scan, so with a partitioned table only matching
+        partitions are read (e.g. `filters=[("year", "=", 2024), ("month", "=", 5)]`).
+
+        Args:
+            entity_name: silver table name
+            columns: columns to return, in that order; all when None
+            filters: (column, operator, value) predicates combined with AND
+        """
         file_path = self.silver_dir / f"{entity_name}.parquet"
+        dataset_dir = self.silver_dir / entity_name
 
-        if not file_path.exists():
+        if file_path.exists():
+            lf = pl.scan_parquet(file_path)
+        elif dataset_dir.is_dir():
+            lf = pl.scan_parquet(dataset_dir / "**" / "*.parquet", hive_partitioning=True)
+        else:
             raise FileNotFoundError(f"File not found: {file_path}")
 
-        return pl.read_parquet(file_path)
+        for column, op, value in filters or []:
+            lf = lf.filter(_FILTER_OPS[op](pl.col(column), value))
+        if columns:
+            lf = lf.select(columns)
+
+        return lf.collect(engine="streaming")
 
 
 @dataclass
@@ -31,289 +376,143 @@ class BaseLoader:
     db_config: dict
     read_silver: ReadSilverParquet
 
+    @contextmanager
     def _get_conn(self):
-        return psycopg2.connect(**self.db_config)
+        """Borrow a pooled connection for one transaction.
+
+        Commits when the block succeeds and rolls back on error, then returns
+        the connection to the pool.
+        """
+        pool = get_pool(self.db_config)
+        conn = pool.getconn()
+
+        try:
+            with conn:
+                yield conn
+        finally:
+            pool.putconn(conn, close=bool(conn.closed))
+
+    def _copy_df(self, cursor, df: pl.DataFrame, copy_sql: str):
+        """Stream a DataFrame with a `_copy_statement` COPY FROM STDIN.
+
+        The frame is serialized to CSV by Polars, chunk by chunk, so no Python
+        row objects are built. Its columns are matched to the COPY columns by position.
+        """
+        for chunk in df.iter_slices(n_rows=COPY_CHUNK_ROWS):
+            buffer = io.BytesIO()
+            chunk.write_csv(buffer, include_header=False)
+            buffer.seek(0)
+            cursor.copy_expert(copy_sql, buffer, size=COPY_READ_SIZE)
+
+    def _upsert_df(self, df: pl.DataFrame, statements: UpsertStatements):
+        """COPY a DataFrame into a temporary staging table and merge it into the target.
+
+        Args:
+            df: rows to load, with columns in the same order as the target columns
+            statements: SQL built by `_upsert_statements`
+        """
+        with self._get_conn() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(statements.create_staging)
+                self._copy_df(cursor, df, statements.copy)
+                cursor.execute(statements.merge)
 
 
 @dataclass
 class LoadDimension(BaseLoader):
     
-    def load_dim_tempo(self):
-        df_dim_tempo = self.read_silver.read("dim_tempo")
+    def load_dim_tempo(self, start: Optional[date] = None, end: Optional[date] = None):
+        """Load dim_tempo. Days already loaded are kept.
 
-        if df_dim_tempo.is_empty():
-            ic("dim_tempo empty — load skipped")
-            return
-
-        sql = """
-                INSERT INTO analytics.dim_tempo (
-                    id_tempo,
-                    data_completa,
-                    ano,
-                    mes,
-                    dia,
-                    trimestre,
-                    semana,
-                    dia_semana,
-                    eh_fim_semana
-                ) 
-                VALUES %s
+        Without bounds the silver dim_tempo is copied as-is. With bounds, the
+        calendar between them is generated (`build_dim_tempo`); a missing bound
+        is taken from the silver dim_tempo's date range.
         """
+        if start is None and end is None:
+            df_dim_tempo = self.read_silver.read("dim_tempo", columns=list(DIM_TEMPO_COLUMNS))
+        else:
+            if start is None or end is None:
+                bounds = self.read_silver.read("dim_tempo", columns=["data_completa"])
+                start = start or bounds["data_completa"].min()
+                end = end or bounds["data_completa"].max()
+            df_dim_tempo = build_dim_tempo(start, end) if start and end else pl.DataFrame()
 
-        records = list(df_dim_tempo.iter_rows())
+        if df_dim_tempo.is_empty():
+            logger.info("dim_tempo empty — load skipped")
+            return
 
-        with self._get_conn() as conn:
-            with conn.cursor() as cursor:
-                execute_values(cursor, sql, records, page_size=1000)
+        self._upsert_df(df_dim_tempo, DIM_TEMPO_UPSERT)
 
-        ic("dim_tempo load completed successfully")
+        logger.info("dim_tempo load completed successfully")
 
     def load_dim_clientes(self):
-        df_dim_cliente = self.read_silver.read("dim_clientes")
+        df_dim_cliente = self.read_silver.read("dim_clientes", columns=list(DIM_CLIENTE_COLUMNS))
 
         if df_dim_cliente.is_empty():
-            ic("dim_clients empty — load skipped")
+            logger.info("dim_clients empty — load skipped")
             return
 
-        sql = """
-                INSERT INTO analytics.dim_cliente (
-                    id_cliente_api,
-                    nome_cliente,
-                    cpf_cnpj,
-                    email,
-                    telefone,
-                    endereco,
-                    tipo_cliente,
-                    data_carga
-                ) 
-                VALUES %s
-                ON CONFLICT(id_cliente_api)
-                DO UPDATE SET
-                    nome_cliente = EXCLUDED.nome_cliente,
-                    email = EXCLUDED.email,
-                    telefone = EXCLUDED.telefone,
-                    endereco = EXCLUDED.endereco,
-                    tipo_cliente = EXCLUDED.tipo_cliente,
-                    data_carga = EXCLUDED.data_carga;
-        """
+        self._upsert_df(df_dim_cliente, DIM_CLIENTE_UPSERT)
 
-        records = list(df_dim_cliente.iter_rows())
-
-        with self._get_conn() as conn:
-            with conn.cursor() as cursor:
-                execute_values(cursor, sql, records, page_size=1000)
-
-        ic("dim_clients load completed successfully")
+        logger.info("dim_clients load completed successfully")
 
     def load_dim_lojas(self):
-        df_dim_lojas = self.read_silver.read("dim_lojas")
+        df_dim_lojas = self.read_silver.read("dim_lojas", columns=list(DIM_LOJA_COLUMNS))
 
         if df_dim_lojas.is_empty():
-            ic("dim_stores empty — load skipped")
+            logger.info("dim_stores empty — load skipped")
             return
 
-        sql = """
-                INSERT INTO analytics.dim_loja (
-                    id_loja_api,
-                    nome_loja,
-                    endereco_loja,
-                    data_carga
-                ) 
-                VALUES %s
-                ON CONFLICT(id_loja_api)
-                DO UPDATE SET
-                    nome_loja = EXCLUDED.nome_loja,
-                    endereco_loja = EXCLUDED.endereco_loja,
-                    data_carga = EXCLUDED.data_carga;
-        """
-
-        records = list(df_dim_lojas.iter_rows())
+        self._upsert_df(df_dim_lojas, DIM_LOJA_UPSERT)
 
-        with self._get_conn() as conn:
-            with conn.cursor() as cursor:
-                execute_values(cursor, sql, records, page_size=1000)
-
-        ic("dim_stores load completed successfully")
+        logger.info("dim_stores load completed successfully")
 
     def load_dim_produto(self):
-        df_dim_produtos = self.read_silver.read("dim_produtos")
+        df_dim_produtos = self.read_silver.read("dim_produtos", columns=list(DIM_PRODUTO_COLUMNS))
 
         if df_dim_produtos.is_empty():
-            ic("dim_products empty — load skipped")
+            logger.info("dim_products empty — load skipped")
             return
 
-        sql = """
-                INSERT INTO analytics.dim_produto (
-                    id_produto_api,
-                    nome_produto,
-                    descricao_produto,
-                    id_categoria,
-                    preco_venda,
-                    custo_fornecedor,
-                    ativo,
-                    nome_categoria,
-                    descricao_categoria
-                ) 
-                VALUES %s
-                ON CONFLICT (id_produto_api)
-                DO UPDATE SET
-                    nome_produto = EXCLUDED.nome_produto,
-                    descricao_produto = EXCLUDED.descricao_produto,
-                    id_categoria = EXCLUDED.id_categoria,
-                    preco_venda = EXCLUDED.preco_venda,
-                    custo_fornecedor = EXCLUDED.custo_fornecedor,
-                    ativo = EXCLUDED.ativo,
-                    nome_categoria = EXCLUDED.nome_categoria,
-                    descricao_categoria = EXCLUDED.descricao_categoria;
-        """
-
-        records = list(df_dim_produtos.iter_rows())
-
-        with self._get_conn() as conn:
-            with conn.cursor() as cursor:
-                execute_values(cursor, sql, records, page_size=1000)
-
-        ic("dim_products load completed successfully")
+        self._upsert_df(df_dim_produtos, DIM_PRODUTO_UPSERT)
 
+        logger.info("dim_products load completed successfully")
 
 @dataclass
 class LoadFacts(BaseLoader):
 
     def load_fact_estoque(self):
-        df_fact_estoque = self.read_silver.read("fact_estoque")
+        df_fact_estoque = self.read_silver.read("fact_estoque", columns=list(FATO_ESTOQUE_COLUMNS))
 
         if df_fact_estoque.is_empty():
-            ic("fact_inventory empty — load skipped")
+            logger.info("fact_inventory empty — load skipped")
             return
 
-        sql = """
-                INSERT INTO analytics.fato_estoque (
-                    id_estoque_api,
-                    id_tempo,
-                    id_loja,
-                    id_produto,
-                    quantidade_inicial,
-                    quantidade_final,
-                    valor_estoque_inicial,
-                    valor_estoque_final,
-                    entradas,
-                    saidas,
-                    data_carga
-                ) 
-                VALUES %s
-                ON CONFLICT(id_estoque_api)
-                DO UPDATE SET
-                    id_tempo = EXCLUDED.id_tempo,
-                    id_loja = EXCLUDED.id_loja,
-                    id_produto = EXCLUDED.id_produto,
-                    quantidade_inicial = EXCLUDED.quantidade_inicial,
-                    quantidade_final = EXCLUDED.quantidade_final,
-                    valor_estoque_inicial = EXCLUDED.valor_estoque_inicial,
-                    valor_estoque_final = EXCLUDED.valor_estoque_final,
-                    entradas = EXCLUDED.entradas,
-                    saidas = EXCLUDED.saidas,
-                    data_carga = EXCLUDED.data_carga
-
-                WHERE analytics.fato_estoque.data_carga < EXCLUDED.data_carga;
-        """
-
-        records = list(df_fact_estoque.iter_rows())
-
-        with self._get_conn() as conn:
-            with conn.cursor() as cursor:
-                execute_values(cursor, sql, records, page_size=1000)
+        self._upsert_df(df_fact_estoque, FATO_ESTOQUE_UPSERT)
 
-        ic("fact_inventory load completed successfully")
+        logger.info("fact_inventory load completed successfully")
 
     def load_fact_vendas(self):
-        df_fact_vendas = self.read_silver.read("fact_vendas")
+        df_fact_vendas = self.read_silver.read("fact_vendas", columns=list(FATO_VENDAS_COLUMNS))
 
         if df_fact_vendas.is_empty():
-            ic("fact_sales empty — load skipped")
+            logger.info("fact_sales empty — load skipped")
             return
 
-        sql = """
-                INSERT INTO analytics.fato_vendas (
-                    id_venda_api,
-                    id_tempo,
-                    id_loja,
-                    id_cliente,
-                    id_produto,
-                    quantidade,
-                    valor_unitario,
-                    custo_unitario,
-                    valor_total,
-                    custo_total,
-                    lucro,
-                    margem_lucro,
-                    data_carga
-                ) 
-                VALUES %s
-                ON CONFLICT(id_venda_api)
-                DO UPDATE SET
-                    id_tempo = EXCLUDED.id_tempo,
-                    id_loja = EXCLUDED.id_loja,
-                    id_cliente = EXCLUDED.id_cliente,
-                    id_produto = EXCLUDED.id_produto,
-                    quantidade = EXCLUDED.quantidade,
-                    valor_unitario = EXCLUDED.valor_unitario,
-                    custo_unitario = EXCLUDED.custo_unitario,
-                    valor_total = EXCLUDED.valor_total,
-                    custo_total = EXCLUDED.custo_total,
-                    lucro = EXCLUDED.lucro,
-                    margem_lucro = EXCLUDED.margem_lucro,
-                    data_carga = EXCLUDED.data_carga
-                
-                WHERE analytics.fato_vendas.data_carga < EXCLUDED.data_carga;
-        """
+        self._upsert_df(df_fact_vendas, FATO_VENDAS_UPSERT)
 
-        records = list(df_fact_vendas.iter_rows())
-
-        with self._get_conn() as conn:
-            with conn.cursor() as cursor:
-                execute_values(cursor, sql, records, page_size=1000)
-
-        ic("fact_sales load completed successfully")
+        logger.info("fact_sales load completed successfully")
 
     def load_fact_distribuicao(self):
-        df_fact_distribuicao = self.read_silver.read("fact_distribuicoes")
+        df_fact_distribuicao = self.read_silver.read("fact_distribuicoes", columns=list(FATO_DISTRIBUICOES_COLUMNS))
 
         if df_fact_distribuicao.is_empty():
-            ic("fact_distributions empty — load skipped")
+            logger.info("fact_distributions empty — load skipped")
             return
 
-        sql = """
-                INSERT INTO analytics.fato_distribuicoes (
-                    id_distribuicao_api,
-                    id_loja_origem,
-                    id_loja_destino,
-                    id_tempo,
-                    id_produto,
-                    quantidade,
-                    status,
-                    data_carga
-                ) 
-                VALUES %s
-                ON CONFLICT(id_distribuicao_api)
-                DO UPDATE SET
-                    id_loja_origem = EXCLUDED.id_loja_origem,
-                    id_loja_destino = EXCLUDED.id_loja_destino,
-                    id_tempo = EXCLUDED.id_tempo,
-                    id_produto = EXCLUDED.id_produto,
-                    quantidade = EXCLUDED.quantidade,
-                    status = EXCLUDED.status,
-                    data_carga = EXCLUDED.data_carga
-                
-                WHERE analytics.fato_distribuicoes.data_carga < EXCLUDED.data_carga;
-        """
-
-        records = list(df_fact_distribuicao.iter_rows())
-
-        with self._get_conn() as conn:
-            with conn.cursor() as cursor:
-                execute_values(cursor, sql, records, page_size=1000)
+        self._upsert_df(df_fact_distribuicao, FATO_DISTRIBUICOES_UPSERT)
 
-        ic("fact_distributions load completed successfully")
+        logger.info("fact_distributions load completed successfully")
 
 if __name__ == '__main__':
     BASE_DIR = Path(__file__).resolve().parent
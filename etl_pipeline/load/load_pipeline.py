@@ -14,23 +14,53 @@ Typical usage:
     pipeline.load_all()             # load all dims and facts
     pipeline.load_all_dimensions()  # load only dimensions
     pipeline.load_all_facts()       # load only facts
+    pipeline.close()                # release pooled connections
 
 Notes:
 - The pipeline expects silver parquet files under:
     <project_root>/etl_pipeline/data/silver/dims
     <project_root>/etl_pipeline/data/silver/facts
-- Loaders are configured via DB_CONFIG from load.load_entities.
+- Loaders are configured via DB_CONFIG from load.load_entities and share a
+  connection pool per config.
 """
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import Callable, Dict, List
 
 from load.load_entities import (
     ReadSilverParquet,
     LoadDimension,
     LoadFacts,
     DB_CONFIG,
+    POOL_MAX_CONN,
+    close_pools,
 )
 
+# Loaders of the same kind touch different tables, so they can run together;
+# each holds one pooled connection, so never run more than the pool allows
+MAX_LOAD_WORKERS = min(4, POOL_MAX_CONN)
+
+
+def _run_loaders(loaders: Dict[str, Callable[[], None]], label: str) -> None:
+    """Run independent loaders concurrently, logging failures per entity."""
+
+    def run(name: str, fn: Callable[[], None]) -> None:
+        try:
+            print(f"[INFO] Iniciando carga {label}: {name}")
+            fn()
+        except Exception as exc:
+            print(f"[ERROR] Falha ao carregar {name}: {exc}")
+
+    if not loaders:
+        return
+
+    # Leaving the with-block waits for every loader to finish
+    with ThreadPoolExecutor(
+        max_workers=min(len(loaders), MAX_LOAD_WORKERS)
+    ) as executor:
+        for name, fn in loaders.items():
+            executor.submit(run, name, fn)
+
 
 class LoadPipeline:
     """Pipeline orchestrator for loading dimensions and facts into a database.
@@ -59,6 +89,18 @@ class LoadPipeline:
         self.loader_dims = LoadDimension(DB_CONFIG, self.reader_dims)
         self.loader_facts = LoadFacts(DB_CONFIG, self.reader_facts)
 
+        self.dimension_loaders: Dict[str, Callable[[], None]] = {
+            "dim_tempo": self.loader_dims.load_dim_tempo,
+            "dim_clientes": self.loader_dims.load_dim_clientes,
+            "dim_lojas": self.loader_dims.load_dim_lojas,
+            "dim_produtos": self.loader_dims.load_dim_produto,
+        }
+        self.fact_loaders: Dict[str, Callable[[], None]] = {
+            "fact_estoque": self.loader_facts.load_fact_estoque,
+            "fact_vendas": self.loader_facts.load_fact_vendas,
+            "fact_distribuicoes": self.loader_facts.load_fact_distribuicao,
+        }
+
     def load_all_dimensions(self, selected: List[str] | None = None):
         """Load all dimension tables or a selected subset.
 
@@ -66,25 +108,18 @@ class LoadPipeline:
             selected: Optional list of dimension keys to run (e.g. 'dim_clientes').
                       If None, all known dimensions are loaded.
         """
-        mapping = {
-            "dim_tempo": self.loader_dims.load_dim_tempo,
-            "dim_clientes": self.loader_dims.load_dim_clientes,
-            "dim_lojas": self.loader_dims.load_dim_lojas,
-            "dim_produtos": self.loader_dims.load_dim_produto,
-        }
-
+        mapping = self.dimension_loaders
         to_run = mapping.keys() if not selected else selected
 
+        loaders = {}
         for name in to_run:
             fn = mapping.get(name)
             if not fn:
                 print(f"[WARN] Dimensão desconhecida: {name}")
                 continue
-            try:
-                print(f"[INFO] Iniciando carga da dimensão: {name}")
-                fn()
-            except Exception as exc:
-                print(f"[ERROR] Falha ao carregar {name}: {exc}")
+            loaders[name] = fn
+
+        _run_loaders(loaders, "da dimensão")
 
     def load_all_facts(self, selected: List[str] | None = None):
         """Load all fact tables or a selected subset.
@@ -93,27 +128,29 @@ class LoadPipeline:
             selected: Optional list of fact keys to run (e.g. 'fact_vendas').
                       If None, all known facts are loaded.
         """
-        mapping = {
-            "fact_estoque": self.loader_facts.load_fact_estoque,
-            "fact_vendas": self.loader_facts.load_fact_vendas,
-            "fact_distribuicoes": self.loader_facts.load_fact_distribuicao,
-        }
-
+        mapping = self.fact_loaders
         to_run = mapping.keys() if not selected else selected
 
+        loaders = {}
         for name in to_run:
             fn = mapping.get(name)
             if not fn:
                 print(f"[WARN] Fato desconhecido: {name}")
                 continue
-            try:
-                print(f"[INFO] Iniciando carga do fato: {name}")
-                fn()
-            except Exception as exc:
-                print(f"[ERROR] Falha ao carregar {name}: {exc}")
+            loaders[name] = fn
+
+        _run_loaders(loaders, "do fato")
+
+    def close(self):
+        """Close the pooled database connections used by the loaders."""
+        close_pools()
 
     def load_all(self):
-        """Load all dimensions first, then all facts."""
+        """Load all dimensions first, then all facts.
+
+        Loaders within each group run concurrently; facts only start once
+        every dimension load has finished.
+        """
         self.load_all_dimensions()
         self.load_all_facts()
 
@@ -123,7 +160,16 @@ def _get_project_root() -> Path:
     return Path(__file__).resolve().parent.parent.parent
 
 if __name__ == "__main__":
+    import logging
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
     project_root = _get_project_root()
     pipeline = LoadPipeline(project_root)
 
-    pipeline.load_all()
+    try:
+        pipeline.load_all()
+    finally:
+        pipeline.close()
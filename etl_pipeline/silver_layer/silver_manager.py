@@ -5,16 +5,41 @@ This module provides the SilverLayerManager class which orchestrates
 data transformations from bronze to silver layer.
 """
 
+import hashlib
+import json
 import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 from datetime import datetime
 import polars as pl
 
-from silver_layer.transformations import DimensionTransformer, FactTransformer
+from etl_pipeline.config import PARQUET_COMPRESSION, PARQUET_COMPRESSION_LEVEL
+from silver_layer.transformations import (
+    TIME_COLUMNS,
+    DimensionTransformer,
+    FactTransformer,
+)
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on entities transformed at once by transform_all
+MAX_TRANSFORM_WORKERS = os.cpu_count() or 4
+
+
+# Silver parquet layout: bounded row groups with statistics, so loaders can
+# read row groups in parallel and prune them by predicate
+PARQUET_WRITE_KWARGS = dict(
+    compression=PARQUET_COMPRESSION,
+    compression_level=PARQUET_COMPRESSION_LEVEL,
+    statistics=True,
+    row_group_size=256_000,
+    data_page_size=1 << 20,
+)
+
 
 class SilverLayerManager:
     """
@@ -38,6 +63,17 @@ class SilverLayerManager:
         "distribuicoes": "fact_distribuicoes",
     }
 
+    # Bronze entities each dimension/fact is built from
+    SOURCES = {
+        "clientes": ("clientes",),
+        "produtos": ("produtos", "categorias"),
+        "lojas": ("lojas",),
+        "tempo": tuple(TIME_COLUMNS),
+        "vendas": ("vendas", "produtos"),
+        "estoque": ("estoque", "produtos"),
+        "distribuicoes": ("distribuicao_interna",),
+    }
+
     def __init__(
         self,
         bronze_dir: Optional[Path] = None,
@@ -75,28 +111,121 @@ class SilverLayerManager:
         self.dimension_transformer = DimensionTransformer(self.bronze_dir)
         self.fact_transformer = FactTransformer(self.bronze_dir)
 
+        # Transformation methods resolved once; a missing one fails here
+        self._dim_methods = {
+            name: getattr(self.dimension_transformer, f"transform_{name}")
+            for name in self.DIMENSIONS
+        }
+        self._fact_methods = {
+            name: getattr(self.fact_transformer, f"transform_{name}")
+            for name in self.FACTS
+        }
+        # Uncollected plans, for lazy saves and batched collection
+        self._build_methods = {
+            **{
+                name: getattr(self.dimension_transformer, f"build_{name}")
+                for name in self.DIMENSIONS
+            },
+            **{
+                name: getattr(self.fact_transformer, f"build_{name}")
+                for name in self.FACTS
+            },
+        }
+
+        # path -> (mtime_ns, size, stats) of the last get_statistics read
+        self._stats_cache: Dict[Path, Tuple[int, int, Dict]] = {}
+
+        # entity -> fingerprint of the bronze files its saved output was built from
+        self._manifest_path = self.silver_dir / ".manifest.json"
+        self._manifest: Dict[str, str] = self._load_manifest()
+        self._manifest_lock = threading.Lock()
+
         # Setup logging
         self._setup_logging(log_level)
 
-        logger.info(f"✓ SilverLayerManager initialized")
-        logger.debug(f"  Bronze dir: {self.bronze_dir}")
-        logger.debug(f"  Silver dir: {self.silver_dir}")
+        logger.info("✓ SilverLayerManager initialized")
+        logger.debug("  Bronze dir: %s", self.bronze_dir)
+        logger.debug("  Silver dir: %s", self.silver_dir)
 
     def _setup_logging(self, log_level: str) -> None:
-        """Setup logging configuration."""
-        handler = logging.StreamHandler()
-        formatter = logging.Formatter(
-            "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-        )
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
+        """Setup logging configuration.
+
+        The handler is attached once per process, however many managers
+        are created; later calls only update the level.
+        """
+        if not any(isinstance(h, logging.StreamHandler) for h in logger.handlers):
+            handler = logging.StreamHandler()
+            formatter = logging.Formatter(
+                "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+            )
+            handler.setFormatter(formatter)
+            logger.addHandler(handler)
         logger.setLevel(getattr(logging, log_level))
 
+    def _load_manifest(self) -> Dict[str, str]:
+        """Read the build manifest, starting empty if it is missing or corrupt."""
+        try:
+            with open(self._manifest_path, "rb") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable manifest {self._manifest_path}: {e}")
+            return {}
+
+    def _fingerprint(self, name: str) -> str:
+        """Hash of (path, mtime, size) of every bronze file feeding an entity."""
+        digest = hashlib.blake2b(digest_size=16)
+        for entity in self.SOURCES[name]:
+            for path in sorted((self.bronze_dir / entity).rglob("*.parquet")):
+                st = path.stat()
+                digest.update(f"{path}\0{st.st_mtime_ns}\0{st.st_size}\n".encode())
+        return digest.hexdigest()
+
+    def _is_current(self, name: str, fingerprint: str, output_path: Path) -> bool:
+        """Whether the saved output was built from the current bronze files."""
+        return self._manifest.get(name) == fingerprint and output_path.exists()
+
+    def _record_fingerprint(self, name: str, fingerprint: str) -> None:
+        """Store an entity's fingerprint and persist the manifest atomically."""
+        with self._manifest_lock:
+            self._manifest[name] = fingerprint
+            tmp_path = self._manifest_path.with_suffix(".json.tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(self._manifest, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self._manifest_path)
+
+    def _output_path(self, name: str) -> Path:
+        """Silver parquet file of a dimension or fact."""
+        if name in self.DIMENSIONS:
+            return self.dims_dir / f"{self.DIMENSIONS[name]}.parquet"
+        return self.facts_dir / f"{self.FACTS[name]}.parquet"
+
+    @staticmethod
+    def _save_frame(
+        df: Union[pl.DataFrame, pl.LazyFrame],
+        output_path: Path,
+    ) -> int:
+        """
+        Write a transformed entity to parquet and return its row count.
+
+        LazyFrames are streamed with sink_parquet, so the table is never
+        fully materialized; their row count is read from the written footer.
+        """
+        if isinstance(df, pl.LazyFrame):
+            df.sink_parquet(output_path, **PARQUET_WRITE_KWARGS)
+            return pl.scan_parquet(output_path).select(pl.len()).collect().item()
+
+        df.write_parquet(output_path, **PARQUET_WRITE_KWARGS)
+        return len(df)
+
     def transform_dimension(
          self,
          dimension_name: str,
          save: bool = True,
-     ) -> pl.DataFrame:
+         lazy: bool = False,
+         force: bool = False,
+     ) -> Union[pl.DataFrame, pl.LazyFrame]:
          """
          Transform a specific dimension from bronze layer.
 
@@ -106,11 +235,17 @@ class SilverLayerManager:
              Name of the dimension (clientes, produtos, lojas, tempo).
          save : bool
              Whether to save the transformed data to parquet.
+         lazy : bool
+             Keep the result lazy: it is streamed to parquet when saved and
+             a LazyFrame (scanning the saved file) is returned.
+         force : bool
+             Rebuild even if the bronze inputs are unchanged since the
+             saved output was written.
 
          Returns
          -------
-         pl.DataFrame
-             Transformed dimension dataframe.
+         pl.DataFrame or pl.LazyFrame
+             Transformed dimension dataframe, lazy when ``lazy`` is True.
 
          Raises
          ------
@@ -123,46 +258,52 @@ class SilverLayerManager:
                  f"Valid options: {list(self.DIMENSIONS.keys())}"
              )
 
-         logger.info(f"Transforming dimension: {dimension_name}")
+         output_path = self.dims_dir / f"{self.DIMENSIONS[dimension_name]}.parquet"
 
-         try:
-             # Get transformation method
-             transform_method = getattr(
-                 self.dimension_transformer,
-                 f"transform_{dimension_name}",
-                 None,
-             )
-
-             if not transform_method:
-                 raise AttributeError(
-                     f"Transformation method not found for {dimension_name}"
+         if save:
+             fingerprint = self._fingerprint(dimension_name)
+             if not force and self._is_current(dimension_name, fingerprint, output_path):
+                 logger.info(
+                     "✓ Dimension %s unchanged, reusing %s", dimension_name, output_path
                  )
+                 if lazy:
+                     return pl.scan_parquet(output_path)
+                 return pl.read_parquet(output_path)
+
+         logger.info("Transforming dimension: %s", dimension_name)
 
+         try:
              # Execute transformation
-             df = transform_method()
+             if lazy:
+                 df = self._build_methods[dimension_name]()
+             else:
+                 df = self._dim_methods[dimension_name]()
 
              if save:
-                 output_path = (
-                     self.dims_dir / f"{self.DIMENSIONS[dimension_name]}.parquet"
-                 )
-                 df.write_parquet(output_path, compression="snappy")
+                 n_rows = self._save_frame(df, output_path)
+                 self._record_fingerprint(dimension_name, fingerprint)
                  logger.info(
-                     f"✓ Dimension {dimension_name} saved: {output_path} "
-                     f"({len(df)} rows)"
+                     "✓ Dimension %s saved: %s (%d rows)", dimension_name, output_path, n_rows
                  )
+                 if lazy:
+                     # Later reads come from the file instead of re-running the plan
+                     df = pl.scan_parquet(output_path)
 
-             logger.debug(f"  Schema: {df.schema}")
+             if logger.isEnabledFor(logging.DEBUG):
+                 logger.debug("  Schema: %s", df.collect_schema())
              return df
 
          except Exception as e:
-             logger.error(f"✗ Error transforming dimension {dimension_name}: {e}")
+             logger.error("✗ Error transforming dimension %s: %s", dimension_name, e)
              raise
 
     def transform_fact(
          self,
          fact_name: str,
          save: bool = True,
-     ) -> pl.DataFrame:
+         lazy: bool = False,
+         force: bool = False,
+     ) -> Union[pl.DataFrame, pl.LazyFrame]:
          """
          Transform a specific fact from bronze layer.
 
@@ -172,11 +313,17 @@ class SilverLayerManager:
              Name of the fact (vendas, estoque, distribuicoes).
          save : bool
              Whether to save the transformed data to parquet.
+         lazy : bool
+             Keep the result lazy: it is streamed to parquet when saved and
+             a LazyFrame (scanning the saved file) is returned.
+         force : bool
+             Rebuild even if the bronze inputs are unchanged since the
+             saved output was written.
 
          Returns
          -------
-         pl.DataFrame
-             Transformed fact dataframe.
+         pl.DataFrame or pl.LazyFrame
+             Transformed fact dataframe, lazy when ``lazy`` is True.
 
          Raises
          ------
@@ -189,70 +336,138 @@ class SilverLayerManager:
                  f"Valid options: {list(self.FACTS.keys())}"
              )
 
-         logger.info(f"Transforming fact: {fact_name}")
-
-         try:
-             # Get transformation method
-             transform_method = getattr(
-                 self.fact_transformer,
-                 f"transform_{fact_name}",
-                 None,
-             )
+         output_path = self.facts_dir / f"{self.FACTS[fact_name]}.parquet"
 
-             if not transform_method:
-                 raise AttributeError(
-                     f"Transformation method not found for {fact_name}"
+         if save:
+             fingerprint = self._fingerprint(fact_name)
+             if not force and self._is_current(fact_name, fingerprint, output_path):
+                 logger.info(
+                     "✓ Fact %s unchanged, reusing %s", fact_name, output_path
                  )
+                 if lazy:
+                     return pl.scan_parquet(output_path)
+                 return pl.read_parquet(output_path)
 
+         logger.info("Transforming fact: %s", fact_name)
+
+         try:
              # Execute transformation
-             df = transform_method()
+             if lazy:
+                 df = self._build_methods[fact_name]()
+             else:
+                 df = self._fact_methods[fact_name]()
 
              if save:
-                 output_path = self.facts_dir / f"{self.FACTS[fact_name]}.parquet"
-                 df.write_parquet(output_path, compression="snappy")
+                 n_rows = self._save_frame(df, output_path)
+                 self._record_fingerprint(fact_name, fingerprint)
                  logger.info(
-                     f"✓ Fact {fact_name} saved: {output_path} "
-                     f"({len(df)} rows)"
+                     "✓ Fact %s saved: %s (%d rows)", fact_name, output_path, n_rows
                  )
+                 if lazy:
+                     # Later reads come from the file instead of re-running the plan
+                     df = pl.scan_parquet(output_path)
 
-             logger.debug(f"  Schema: {df.schema}")
+             if logger.isEnabledFor(logging.DEBUG):
+                 logger.debug("  Schema: %s", df.collect_schema())
              return df
 
          except Exception as e:
-             logger.error(f"✗ Error transforming fact {fact_name}: {e}")
+             logger.error("✗ Error transforming fact %s: %s", fact_name, e)
              raise
 
-    def transform_all(self) -> Dict[str, int]:
+    @contextmanager
+    def run_timestamp(self, data_carga: Optional[datetime] = None) -> Iterator[datetime]:
+        """
+        Stamp every table built inside the block with the same data_carga.
+
+        Used by transform_all, and by orchestrators that transform entities
+        one by one but still need a single load timestamp per run.
+
+        Parameters
+        ----------
+        data_carga : datetime, optional
+            Load timestamp of the run. Defaults to now.
+        """
+        data_carga = data_carga or datetime.now()
+        self.dimension_transformer.data_carga = data_carga
+        self.fact_transformer.data_carga = data_carga
+        try:
+            yield data_carga
+        finally:
+            self.dimension_transformer.data_carga = None
+            self.fact_transformer.data_carga = None
+
+    def transform_all(self, force: bool = False) -> Dict[str, int]:
         """
         Transform all dimensions and facts.
 
+        Entities whose bronze inputs are unchanged since their last save are
+        not rebuilt, unless ``force`` is True.
+
         Returns
         -------
         dict
             Dictionary with row counts for each transformed entity.
         """
         logger.info("Starting full transformation...")
-        results = {}
 
-        # Transform all dimensions
-        logger.info("Transforming dimensions...")
-        for dim_name in self.DIMENSIONS.keys():
-            try:
-                df = self.transform_dimension(dim_name, save=True)
-                results[dim_name] = len(df)
-            except Exception as e:
-                logger.error(f"Failed to transform dimension {dim_name}: {e}")
-                results[dim_name] = 0
+        jobs = [(name, "dimension") for name in self.DIMENSIONS] + [
+            (name, "fact") for name in self.FACTS
+        ]
+        results: Dict[str, int] = {}
+        # name -> (kind, output_path, fingerprint, plan) of entities to rebuild
+        pending: Dict[str, Tuple[str, Path, str, pl.LazyFrame]] = {}
+
+        # Every table built in this run carries the same data_carga
+        with self.run_timestamp():
+            for name, kind in jobs:
+                output_path = self._output_path(name)
+                fingerprint = self._fingerprint(name)
+                if not force and self._is_current(name, fingerprint, output_path):
+                    logger.info("✓ %s unchanged, reusing %s", name, output_path)
+                    results[name] = self._parquet_stats(output_path, kind)["rows"]
+                    continue
+                try:
+                    plan = self._build_methods[name]()
+                    pending[name] = (kind, output_path, fingerprint, plan)
+                except Exception as e:
+                    logger.error("Failed to transform %s %s: %s", kind, name, e)
+                    results[name] = 0
+
+        # One collect for every plan, so bronze scans shared between entities
+        # (produtos feeds three of them) are decoded once
+        plans = [plan for _, _, _, plan in pending.values()]
+        try:
+            frames = pl.collect_all(plans, engine="streaming")
+        except Exception as e:
+            logger.warning(
+                "Batched collect failed (%s); collecting entities one by one", e
+            )
+            frames = [None] * len(plans)
 
-        # Transform all facts
-        logger.info("Transforming facts...")
-        for fact_name in self.FACTS.keys():
+        def save(name: str, df: Optional[pl.DataFrame]) -> int:
+            kind, output_path, fingerprint, plan = pending[name]
             try:
-                df = self.transform_fact(fact_name, save=True)
-                results[fact_name] = len(df)
+                if df is None:
+                    df = plan.collect(engine="streaming")
+                n_rows = self._save_frame(df, output_path)
+                self._record_fingerprint(name, fingerprint)
+                logger.info(
+                    "✓ %s %s saved: %s (%d rows)", kind, name, output_path, n_rows
+                )
+                return n_rows
             except Exception as e:
-                logger.error(f"Failed to transform fact {fact_name}: {e}")
-                results[fact_name] = 0
+                logger.error("Failed to transform %s %s: %s", kind, name, e)
+                return 0
+
+        # Parquet encoding and compression release the GIL
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(len(pending), MAX_TRANSFORM_WORKERS))
+        ) as executor:
+            saved = executor.map(save, pending, frames)
+            results.update(zip(pending, saved))
+
+        results = {name: results[name] for name, _ in jobs}
 
         logger.info("✓ Full transformation completed")
         return results
@@ -307,6 +522,34 @@ class SilverLayerManager:
             logger.error(f"Error reading fact {fact_name}: {e}")
             raise
 
+    def _parquet_stats(self, path: Path, kind: str) -> Dict:
+        """Row/column counts of a parquet file, read from its footer only.
+
+        Results are cached per path and reused while the file's mtime and
+        size are unchanged.
+        """
+        st = path.stat()
+        cached = self._stats_cache.get(path)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+
+        lf = pl.scan_parquet(path)
+        # pl.len() is answered from row group metadata, no pages are decoded
+        n_rows = lf.select(pl.len()).collect().item()
+
+        entry = {
+            "type": kind,
+            "rows": n_rows,
+            "columns": len(lf.collect_schema()),
+            "file_size_mb": st.st_size / (1024 * 1024),
+        }
+        self._stats_cache[path] = (st.st_mtime_ns, st.st_size, entry)
+        return entry
+
+    def invalidate_stats(self) -> None:
+        """Drop cached statistics, e.g. after files were changed in place."""
+        self._stats_cache.clear()
+
     def get_statistics(self) -> Dict[str, Dict]:
         """
         Get statistics for all transformed entities.
@@ -322,13 +565,7 @@ class SilverLayerManager:
             try:
                 path = self.dims_dir / f"{file_name}.parquet"
                 if path.exists():
-                    df = pl.read_parquet(path)
-                    stats[dim_name] = {
-                        "type": "dimension",
-                        "rows": len(df),
-                        "columns": len(df.columns),
-                        "file_size_mb": path.stat().st_size / (1024 * 1024),
-                    }
+                    stats[dim_name] = self._parquet_stats(path, "dimension")
             except Exception as e:
                 logger.warning(f"Could not get stats for {dim_name}: {e}")
 
@@ -336,13 +573,7 @@ class SilverLayerManager:
             try:
                 path = self.facts_dir / f"{file_name}.parquet"
                 if path.exists():
-                    df = pl.read_parquet(path)
-                    stats[fact_name] = {
-                        "type": "fact",
-                        "rows": len(df),
-                        "columns": len(df.columns),
-                        "file_size_mb": path.stat().st_size / (1024 * 1024),
-                    }
+                    stats[fact_name] = self._parquet_stats(path, "fact")
             except Exception as e:
                 logger.warning(f"Could not get stats for {fact_name}: {e}")
 
@@ -370,24 +601,18 @@ Location: {self.silver_dir}
 
 DIMENSIONS:
 """
-        total_rows = 0
-        total_size = 0
-
-        for dim_name, file_name in self.DIMENSIONS.items():
-            if dim_name in stats:
-                s = stats[dim_name]
-                report += f"  {dim_name:15} {s['rows']:>10,} rows  {s['columns']:>3} cols  {s['file_size_mb']:>8.2f} MB\n"
-                total_rows += s["rows"]
-                total_size += s["file_size_mb"]
+        lines = {"dimension": [], "fact": []}
+        for name, s in stats.items():
+            lines[s["type"]].append(
+                f"  {name:15} {s['rows']:>10,} rows  {s['columns']:>3} cols  {s['file_size_mb']:>8.2f} MB"
+            )
 
-        report += f"\nFACTS:\n"
-        for fact_name, file_name in self.FACTS.items():
-            if fact_name in stats:
-                s = stats[fact_name]
-                report += f"  {fact_name:15} {s['rows']:>10,} rows  {s['columns']:>3} cols  {s['file_size_mb']:>8.2f} MB\n"
-                total_rows += s["rows"]
-                total_size += s["file_size_mb"]
+        total_rows = sum(s["rows"] for s in stats.values())
+        total_size = sum(s["file_size_mb"] for s in stats.values())
 
+        report += "".join(f"{line}\n" for line in lines["dimension"])
+        report += "\nFACTS:\n"
+        report += "".join(f"{line}\n" for line in lines["fact"])
         report += f"""
 ─────────────────────────────────────────────────────────────────────────
 TOTAL: {len(stats)} entities | {total_rows:,} rows | {total_size:.2f} MB
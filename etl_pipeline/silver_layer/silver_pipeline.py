@@ -6,19 +6,27 @@ data to silver layer dimensions and facts.
 """
 
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
+
+import polars as pl
 
 from silver_layer.silver_manager import SilverLayerManager
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-)
 logger = logging.getLogger(__name__)
 
+BANNER = "=" * 70
+
+# Threads used to stat/unlink files in cleanup_old_data
+CLEANUP_WORKERS = int(os.getenv("SILVER_CLEANUP_WORKERS", "8"))
+
+# Rows per batch of Polars' streaming engine; smaller batches cap the peak
+# memory of the exploded vendas/distribuicoes items
+STREAMING_CHUNK_SIZE = int(os.getenv("POLARS_STREAMING_CHUNK_SIZE", "50000"))
+
 
 class SilverPipeline:
     """
@@ -43,6 +51,7 @@ class SilverPipeline:
         silver_dir : Path, optional
             Path to silver layer output. Defaults to project structure.
         """
+        pl.Config.set_streaming_chunk_size(STREAMING_CHUNK_SIZE)
         self.manager = SilverLayerManager(
             bronze_dir=bronze_dir,
             silver_dir=silver_dir,
@@ -58,79 +67,58 @@ class SilverPipeline:
         dict
             Results with row counts for each transformed entity.
         """
-        logger.info("=" * 70)
+        logger.info(BANNER)
         logger.info("STARTING FULL TRANSFORMATION - SILVER LAYER")
-        logger.info("=" * 70)
+        logger.info(BANNER)
 
         try:
             results = self.manager.transform_all()
             self.execution_results = results
 
-            logger.info("=" * 70)
+            logger.info(BANNER)
             logger.info("✓ FULL TRANSFORMATION COMPLETED SUCCESSFULLY")
-            logger.info("=" * 70)
+            logger.info(BANNER)
 
             return results
 
         except Exception as e:
-            logger.error(f"✗ Error during full transformation: {e}")
+            logger.error("✗ Error during full transformation: %s", e)
             raise
 
-    # def run_single_dimension_extraction(self, dimension_name: str) -> int:
-    #     """
-    #     Run extraction for a single dimension.
-
-    #     Parameters
-    #     ----------
-    #     dimension_name : str
-    #         Name of the dimension to extract.
-
-    #     Returns
-    #     -------
-    #     int
-    #         Number of rows transformed.
-    #     """
-    #     logger.info(f"Transformando dimensão: {dimension_name}")
-
-    #     try:
-    #         df = self.manager.transform_dimension(dimension_name, save=True)
-    #         row_count = len(df)
-    #         self.execution_results[dimension_name] = row_count
-
-    #         logger.info(f"✓ Dimensão {dimension_name} transformada: {row_count} linhas")
-    #         return row_count
-
-    #     except Exception as e:
-    #         logger.error(f"✗ Erro ao transformar dimensão {dimension_name}: {e}")
-    #         raise
-
-    # def run_single_fact_extraction(self, fact_name: str) -> int:
-    #     """
-    #     Run extraction for a single fact.
-
-    #     Parameters
-    #     ----------
-    #     fact_name : str
-    #         Name of the fact to extract.
-
-    #     Returns
-    #     -------
-    #     int
-    #         Number of rows transformed.
-    #     """
-    #     logger.info(f"Transformando fato: {fact_name}")
-
-    #     try:
-    #         df = self.manager.transform_fact(fact_name, save=True)
-    #         row_count = len(df)
-    #         self.execution_results[fact_name] = row_count
-
-    #         logger.info(f"✓ Fato {fact_name} transformado: {row_count} linhas")
-    #         return row_count
-
-    #     except Exception as e:
-    #         logger.error(f"✗ Erro ao transformar fato {fact_name}: {e}")
-    #         raise
+    def run_single_transformation(self, name: str) -> int:
+        """
+        Run the transformation of a single dimension or fact.
+
+        Lets an orchestrator start an entity as soon as its bronze inputs
+        (``SilverLayerManager.SOURCES``) are written.
+
+        Parameters
+        ----------
+        name : str
+            Name of the dimension or fact to transform.
+
+        Returns
+        -------
+        int
+            Number of rows transformed.
+        """
+        kind = "dimensão" if name in self.manager.DIMENSIONS else "fato"
+        logger.info("Transformando %s: %s", kind, name)
+
+        try:
+            if name in self.manager.DIMENSIONS:
+                df = self.manager.transform_dimension(name, save=True)
+            else:
+                df = self.manager.transform_fact(name, save=True)
+            row_count = len(df)
+            self.execution_results[name] = row_count
+
+            logger.info("✓ %s %s transformada: %d linhas", kind.capitalize(), name, row_count)
+            return row_count
+
+        except Exception as e:
+            logger.error("✗ Erro ao transformar %s %s: %s", kind, name, e)
+            raise
 
     def generate_report(self) -> str:
         """
@@ -162,21 +150,39 @@ class SilverPipeline:
         """
         logger.info(f"Cleaning files older than {days} days...")
 
-        from datetime import timedelta
-        import os
-
         cutoff_time = (datetime.now() - timedelta(days=days)).timestamp()
-        removed_count = 0
 
+        # DirEntry caches its stat result, so each candidate costs one
+        # stat() at most on top of the directory read
+        entries: List[os.DirEntry] = []
         for directory in [self.manager.dims_dir, self.manager.facts_dir]:
-            for file in directory.glob("*.parquet"):
-                if file.stat().st_mtime < cutoff_time:
-                    try:
-                        file.unlink()
-                        removed_count += 1
-                        logger.debug(f"Removed: {file}")
-                    except Exception as e:
-                        logger.error(f"Error removing {file}: {e}")
+            with os.scandir(directory) as it:
+                entries.extend(
+                    entry for entry in it
+                    if entry.name.endswith(".parquet") and entry.is_file()
+                )
+
+        def remove(path: str) -> bool:
+            try:
+                os.unlink(path)
+                logger.debug("Removed: %s", path)
+                return True
+            except OSError as e:
+                logger.error("Error removing %s: %s", path, e)
+                return False
+
+        # stat() and unlink() block on the filesystem and release the GIL
+        with ThreadPoolExecutor(max_workers=CLEANUP_WORKERS) as executor:
+            mtimes = executor.map(lambda entry: entry.stat().st_mtime, entries)
+            old_paths = [
+                entry.path
+                for entry, mtime in zip(entries, mtimes)
+                if mtime < cutoff_time
+            ]
+            removed_count = sum(executor.map(remove, old_paths))
+
+        if removed_count:
+            self.manager.invalidate_stats()
 
         logger.info(f"✓ {removed_count} files removed")
         return removed_count
@@ -194,4 +200,8 @@ def main():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
     main()
\ No newline at end of file
@@ -7,21 +7,97 @@ into standardized silver layer dimensions and facts.
 
 import logging
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
 import polars as pl
-from datetime import datetime
+from datetime import date, datetime, time
+
+from utils.files import latest_parquet_file
 
 logger = logging.getLogger(__name__)
 
 
+# Colunas de data que definem o intervalo de dim_tempo. Só entram
+# entidades que geram fatos: datas de outras (ex.: entradas) nunca são
+# referenciadas por id_tempo e custariam uma leitura a mais do bronze.
 TIME_COLUMNS = {
     "vendas": ["sale_date", "predicted_delivery", "delivered_at"],
     "distribuicao_interna": ["distribution_date"],
     "estoque": ["updated_at"],
-    "entradas": ["entry_date"],
 }
 
+# Valores possíveis de dim_cliente.tipo_cliente
+TIPO_CLIENTE = pl.Enum(["Pessoa Física", "Pessoa Jurídica", "Não Classificado"])
+
+
+def _data_carga_expr(data_carga: Optional[datetime]) -> pl.Expr:
+    """The data_carga column: a typed literal of the run's load timestamp."""
+    return pl.lit(
+        data_carga or datetime.now(), dtype=pl.Datetime("us")
+    ).alias("data_carga")
+
+
+def _id_tempo_expr(data: pl.Expr) -> pl.Expr:
+    """id_tempo (YYYYMMDD as Int32) of a date expression, computed without strings."""
+    return (
+        data.dt.year() * 10_000
+        + data.dt.month().cast(pl.Int32) * 100
+        + data.dt.day().cast(pl.Int32)
+    ).alias("id_tempo")
+
+
+# dim_tempo columns, in order
+TEMPO_COLUMNS = [
+    "id_tempo",
+    "data_completa",
+    "ano",
+    "mes",
+    "dia",
+    "trimestre",
+    "semana",
+    "dia_semana",
+    "eh_fim_semana",
+]
+
+
+def tempo_attributes(data: pl.Expr) -> List[pl.Expr]:
+    """
+    dim_tempo attributes (TEMPO_COLUMNS) of a date or datetime expression.
+
+    Shared with the load layer, which generates calendars for explicit date
+    ranges, so both derive every attribute the same way.
+    """
+    return [
+        data.cast(pl.Date).alias("data_completa"),
+        data.dt.year().alias("ano"),
+        data.dt.month().alias("mes"),
+        data.dt.day().alias("dia"),
+        data.dt.quarter().alias("trimestre"),
+        data.dt.week().alias("semana"),
+        data.dt.weekday().alias("dia_semana"),
+        (data.dt.weekday() >= 5).alias("eh_fim_semana"),
+        _id_tempo_expr(data),
+    ]
+
+
+def _as_datetime(value) -> Optional[datetime]:
+    """
+    Convert a collected min/max value to a datetime.
+
+    Temporal columns already come back as date/datetime; string columns
+    (ISO timestamps from the API) only need their single min/max parsed.
+    """
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, time.min)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    return None
+
 
 class DimensionTransformer:
     """
@@ -41,7 +117,13 @@ class DimensionTransformer:
         """
         self.bronze_dir = bronze_dir
 
-    def _read_bronze_entity(self, entity_name: str) -> Optional[pl.DataFrame]:
+        # entity -> (file, mtime_ns, scan) of the latest bronze file read
+        self._bronze_cache: Dict[str, Tuple[Path, int, pl.LazyFrame]] = {}
+
+        # Load timestamp stamped on every table of a run; None means "now"
+        self.data_carga: Optional[datetime] = None
+
+    def _read_bronze_entity(self, entity_name: str) -> Optional[pl.LazyFrame]:
         """
         Read the most recent parquet file for an entity from bronze layer.
 
@@ -52,8 +134,9 @@ class DimensionTransformer:
 
         Returns
         -------
-        pl.DataFrame or None
-            The dataframe if found, None otherwise.
+        pl.LazyFrame or None
+            A lazy scan of the file if found, None otherwise. Only the
+            columns a transform selects are decoded when it is collected.
         """
         entity_dir = self.bronze_dir / entity_name
 
@@ -62,34 +145,31 @@ class DimensionTransformer:
             return None
 
         try:
-            parquet_files = list(entity_dir.glob("*.parquet"))
-            
-            if not parquet_files:
+            # Get the most recent file
+            latest = latest_parquet_file(entity_dir)
+
+            if latest is None:
                 logger.warning(f"No parquet files found in {entity_dir}")
                 return None
 
-            # Get the most recent file
-            latest_file = max(parquet_files, key=lambda p: p.stat().st_mtime)
-            logger.debug(f"Reading bronze data from: {latest_file}")
+            latest_file = Path(latest.path)
+            mtime = latest.stat().st_mtime_ns
+
+            # Entities feed several transforms; reuse the scan while the
+            # latest file is unchanged
+            cached = self._bronze_cache.get(entity_name)
+            if cached and cached[0] == latest_file and cached[1] == mtime:
+                return cached[2]
 
-            return pl.read_parquet(latest_file)
+            logger.debug(f"Reading bronze data from: {latest_file}")
+            lf = pl.scan_parquet(latest_file)
+            self._bronze_cache[entity_name] = (latest_file, mtime, lf)
+            return lf
         
         except Exception as e:
             logger.error(f"Error reading bronze entity {entity_name}: {e}")
             raise
     
-    def _safe_datetime(self, value):
-        if value is None:
-            return None
-        if isinstance(value, datetime):
-            return value
-        if isinstance(value, str):
-            try:
-                return datetime.fromisoformat(value)
-            except ValueError:
-                return None
-        return None
-    
     def _get_global_date_range(self) -> tuple[datetime, datetime]:
         min_dates = []
         max_dates = []
@@ -97,20 +177,24 @@ class DimensionTransformer:
         for entity, cols in TIME_COLUMNS.items():
             df = self._read_bronze_entity(entity)
 
-            if df is None or df.is_empty():
+            if df is None:
                 continue
 
-            for col in cols:
-                if col not in df.columns:
-                    continue
-
-                series = df[col].drop_nulls()
+            schema = df.collect_schema()
+            cols = [col for col in cols if col in schema]
+            if not cols:
+                continue
 
-                if series.is_empty():
-                    continue
+            # One pass per entity for every min/max; nulls are skipped and
+            # only the time columns are read
+            bounds = df.select(
+                [pl.col(col).min().alias(f"{col}_min") for col in cols]
+                + [pl.col(col).max().alias(f"{col}_max") for col in cols]
+            ).collect(engine="streaming").row(0, named=True)
 
-                min_val = self._safe_datetime(series.min())
-                max_val = self._safe_datetime(series.max())
+            for col in cols:
+                min_val = _as_datetime(bounds[f"{col}_min"])
+                max_val = _as_datetime(bounds[f"{col}_max"])
 
                 if min_val:
                     min_dates.append(min_val)
@@ -134,6 +218,13 @@ class DimensionTransformer:
         """
         logger.info("Transforming clientes dimension...")
 
+        df_transformed = self.build_clientes().collect(engine="streaming")
+
+        logger.info(f"✓ Clientes transformed: {len(df_transformed)} rows")
+        return df_transformed
+
+    def build_clientes(self) -> pl.LazyFrame:
+        """Lazy plan behind transform_clientes, not yet collected."""
         df = self._read_bronze_entity("clientes")
         if df is None:
             raise FileNotFoundError("Bronze clientes data not found")
@@ -150,18 +241,25 @@ class DimensionTransformer:
                 pl.col("address").alias("endereco"),
             )
             .with_columns([
-                pl.when(pl.col("cpf_cnpj").str.len_chars() == 11)
-                    .then(pl.lit("Pessoa Física"))
-                    .when(pl.col("cpf_cnpj").str.len_chars() == 14)
-                    .then(pl.lit("Pessoa Jurídica"))
-                    .otherwise(pl.lit("Não Classificado"))
+                # CPF tem 11 dígitos, CNPJ 14: um único cálculo do tamanho
+                pl.col("cpf_cnpj").str.len_chars()
+                    .replace_strict(
+                        {11: "Pessoa Física", 14: "Pessoa Jurídica"},
+                        default="Não Classificado",
+                        return_dtype=TIPO_CLIENTE,
+                    )
                     .alias("tipo_cliente"),
-                pl.lit(datetime.now()).alias("data_carga"),
+                _data_carga_expr(self.data_carga),
             ])
-            .unique(subset=["id_cliente", "cpf_cnpj"], keep="last")
+            # último registro de cada cliente, na ordem do bronze
+            .group_by(["id_cliente", "cpf_cnpj"], maintain_order=True)
+            .last()
+            .select(
+                "id_cliente", "nome_cliente", "cpf_cnpj", "email",
+                "telefone", "endereco", "tipo_cliente", "data_carga",
+            )
         )
 
-        logger.info(f"✓ Clientes transformed: {len(df_transformed)} rows")
         return df_transformed
 
     def transform_produtos(self) -> pl.DataFrame:
@@ -175,6 +273,13 @@ class DimensionTransformer:
         """
         logger.info("Transforming produtos dimension...")
 
+        df_transformed = self.build_produtos().collect(engine="streaming")
+
+        logger.info(f"✓ Produtos transformed: {len(df_transformed)} rows")
+        return df_transformed
+
+    def build_produtos(self) -> pl.LazyFrame:
+        """Lazy plan behind transform_produtos, not yet collected."""
         df_produtos = self._read_bronze_entity("produtos")
         df_categorias = self._read_bronze_entity("categorias")
 
@@ -196,7 +301,7 @@ class DimensionTransformer:
         if df_categorias is not None:
             df_categorias_renamed = df_categorias.select(
                 pl.col("id").alias("id_categoria"),
-                pl.col("name").alias("nome_categoria"),
+                pl.col("name").cast(pl.Categorical).alias("nome_categoria"),
                 pl.col("description").alias("descricao_categoria"),
             )
 
@@ -207,11 +312,10 @@ class DimensionTransformer:
             )
         else:
             df_transformed = df_transformed.with_columns([
-                pl.lit(None).alias("nome_categoria"),
+                pl.lit(None, dtype=pl.Categorical).alias("nome_categoria"),
                 pl.lit(None).alias("descricao_categoria"),
             ])
 
-        logger.info(f"✓ Produtos transformed: {len(df_transformed)} rows")
         return df_transformed
 
     def transform_lojas(self) -> pl.DataFrame:
@@ -225,6 +329,13 @@ class DimensionTransformer:
         """
         logger.info("Transforming lojas dimension...")
 
+        df_transformed = self.build_lojas().collect(engine="streaming")
+
+        logger.info(f"✓ Lojas transformed: {len(df_transformed)} rows")
+        return df_transformed
+
+    def build_lojas(self) -> pl.LazyFrame:
+        """Lazy plan behind transform_lojas, not yet collected."""
         df = self._read_bronze_entity("lojas")
         if df is None:
             raise FileNotFoundError("Bronze lojas data not found")
@@ -238,12 +349,12 @@ class DimensionTransformer:
                 pl.col("address").alias("endereco_loja")
             )
             .with_columns([
-                pl.lit(datetime.now()).alias("data_carga"),
+                _data_carga_expr(self.data_carga),
             ])
-            .unique(subset=["id_loja"], keep="last")
+            .group_by("id_loja", maintain_order=True)
+            .last()
         )
 
-        logger.info(f"✓ Lojas transformed: {len(df_transformed)} rows")
         return df_transformed
 
     def transform_tempo(self) -> pl.DataFrame:
@@ -257,9 +368,15 @@ class DimensionTransformer:
         pl.DataFrame
             Transformed time dimension with date components.
         """
-
         logger.info("Transforming tempo dimension...")
 
+        df_tempo = self.build_tempo().collect(engine="streaming")
+
+        logger.info(f"✓ Tempo transformed: {len(df_tempo)} rows")
+        return df_tempo
+
+    def build_tempo(self) -> pl.LazyFrame:
+        """Lazy plan behind transform_tempo, not yet collected."""
         min_date, max_date = self._get_global_date_range()
 
         date_range = pl.datetime_range(
@@ -271,32 +388,11 @@ class DimensionTransformer:
 
         df_tempo = (
             pl.DataFrame({"data": date_range})
-            .with_columns([
-                pl.col("data").cast(pl.Date).alias("data_completa"),
-                pl.col("data").dt.year().alias("ano"),
-                pl.col("data").dt.month().alias("mes"),
-                pl.col("data").dt.day().alias("dia"),
-                pl.col("data").dt.quarter().alias("trimestre"),
-                pl.col("data").dt.week().alias("semana"),
-                pl.col("data").dt.weekday().alias("dia_semana"),
-                (pl.col("data").dt.weekday() >= 5).alias("eh_fim_semana"),
-                pl.col("data").dt.strftime("%Y%m%d").cast(pl.Int32).alias("id_tempo"),
-            ])
-            .select([
-                "id_tempo",
-                "data_completa",
-                "ano",
-                "mes",
-                "dia",
-                "trimestre",
-                "semana",
-                "dia_semana",
-                "eh_fim_semana",
-            ])
+            .with_columns(tempo_attributes(pl.col("data")))
+            .select(TEMPO_COLUMNS)
         )
 
-        logger.info(f"✓ Tempo transformed: {len(df_tempo)} rows")
-        return df_tempo
+        return df_tempo.lazy()
 
 
 class FactTransformer:
@@ -317,7 +413,13 @@ class FactTransformer:
         """
         self.bronze_dir = bronze_dir
 
-    def _read_bronze_entity(self, entity_name: str) -> Optional[pl.DataFrame]:
+        # entity -> (file, mtime_ns, scan) of the latest bronze file read
+        self._bronze_cache: Dict[str, Tuple[Path, int, pl.LazyFrame]] = {}
+
+        # Load timestamp stamped on every table of a run; None means "now"
+        self.data_carga: Optional[datetime] = None
+
+    def _read_bronze_entity(self, entity_name: str) -> Optional[pl.LazyFrame]:
         """
         Read the most recent parquet file for an entity from bronze layer.
 
@@ -328,8 +430,9 @@ class FactTransformer:
 
         Returns
         -------
-        pl.DataFrame or None
-            The dataframe if found, None otherwise.
+        pl.LazyFrame or None
+            A lazy scan of the file if found, None otherwise. Only the
+            columns a transform selects are decoded when it is collected.
         """
         entity_dir = self.bronze_dir / entity_name
 
@@ -338,22 +441,36 @@ class FactTransformer:
             return None
 
         try:
-            parquet_files = list(entity_dir.glob("*.parquet"))
-            if not parquet_files:
+            # Get the most recent file
+            latest = latest_parquet_file(entity_dir)
+
+            if latest is None:
                 logger.warning(f"No parquet files found in {entity_dir}")
                 return None
 
-            # Get the most recent file
-            latest_file = max(parquet_files, key=lambda p: p.stat().st_mtime)
-            logger.debug(f"Reading bronze data from: {latest_file}")
+            latest_file = Path(latest.path)
+            mtime = latest.stat().st_mtime_ns
+
+            # Entities feed several transforms; reuse the scan while the
+            # latest file is unchanged
+            cached = self._bronze_cache.get(entity_name)
+            if cached and cached[0] == latest_file and cached[1] == mtime:
+                return cached[2]
 
-            return pl.read_parquet(latest_file)
+            logger.debug(f"Reading bronze data from: {latest_file}")
+            lf = pl.scan_parquet(latest_file)
+            self._bronze_cache[entity_name] = (latest_file, mtime, lf)
+            return lf
         except Exception as e:
             logger.error(f"Error reading bronze entity {entity_name}: {e}")
             raise
     
-    def _add_id_tempo(self, df: pl.DataFrame, col_data: str) -> pl.DataFrame:
-        dtype = df.schema.get(col_data)
+    def _add_id_tempo(self, df: pl.LazyFrame, col_data: str) -> pl.LazyFrame:
+        return df.with_columns(self._id_tempo(df, col_data))
+
+    def _id_tempo(self, df: pl.LazyFrame, col_data: str) -> pl.Expr:
+        """Expressão de id_tempo para a coluna de data de ``df``, conforme seu tipo."""
+        dtype = df.collect_schema().get(col_data)
 
         if dtype == pl.Utf8:
             # string → datetime → date → id_tempo
@@ -366,12 +483,7 @@ class FactTransformer:
             # datetime/date → date
             expr = pl.col(col_data).cast(pl.Date)
 
-        return df.with_columns(
-            expr
-            .dt.strftime("%Y%m%d")
-            .cast(pl.Int32)
-            .alias("id_tempo")
-        )
+        return _id_tempo_expr(expr)
 
     def transform_vendas(self) -> pl.DataFrame:
 
@@ -383,9 +495,15 @@ class FactTransformer:
         pl.DataFrame
             Transformed fact table with sales data.
         """
-
         logger.info("Transforming vendas fact...")
 
+        df_final = self.build_vendas().collect(engine="streaming")
+
+        logger.info(f"✓ Vendas transformed: {len(df_final)} rows")
+        return df_final
+
+    def build_vendas(self) -> pl.LazyFrame:
+        """Lazy plan behind transform_vendas, not yet collected."""
         df_vendas = self._read_bronze_entity("vendas")
         df_produtos = self._read_bronze_entity("produtos")
 
@@ -403,12 +521,13 @@ class FactTransformer:
                 pl.col("items")
             )
             .explode("items")
-            .with_columns([
-                pl.col("items").struct.field("product_id").alias("id_produto"),
-                pl.col("items").struct.field("quantity").alias("quantidade"),
-                pl.col("items").struct.field("unit_price").alias("valor_unitario"),
-                pl.col("items").struct.field("total_price").alias("custo_unitario"),
-            ])
+            .unnest("items")
+            .rename({
+                "product_id": "id_produto",
+                "quantity": "quantidade",
+                "unit_price": "valor_unitario",
+                "total_price": "custo_unitario",
+            })
             .select([
                 "id_venda", "sale_date", "id_loja", "id_cliente",
                 "id_produto", "quantidade", "valor_unitario", "custo_unitario"
@@ -422,6 +541,10 @@ class FactTransformer:
                 pl.col("sale_price").alias("sale_price_prod"),
                 pl.col("cost_price").alias("cost_price_prod"),
             )
+            # só produtos vendidos entram na tabela hash do join
+            prod_cols = prod_cols.join(
+                df_items.select("id_produto").unique(), on="id_produto", how="semi"
+            )
             df_items = (
                 df_items
                 .join(prod_cols, on="id_produto", how="left")
@@ -436,26 +559,27 @@ class FactTransformer:
         df_items = df_items.with_columns([
             (pl.col("quantidade") * pl.col("valor_unitario")).alias("valor_total"),
             (pl.col("quantidade") * pl.col("custo_unitario")).alias("custo_total"),
-        ]).with_columns([
+        ]).with_columns(
             (pl.col("valor_total") - pl.col("custo_total")).alias("lucro"),
+        ).with_columns(
+            # margem reaproveita o lucro já calculado
             pl.when(pl.col("valor_total") > 0)
-              .then((pl.col("valor_total") - pl.col("custo_total")) / pl.col("valor_total"))
+              .then(pl.col("lucro") / pl.col("valor_total"))
               .otherwise(None)
               .alias("margem_lucro")
-        ])
-
-        # id_tempo e data_carga
-        df_items = self._add_id_tempo(df_items, "sale_date")
-        df_items = df_items.with_columns(pl.lit(datetime.now()).alias("data_carga"))
+        )
 
+        # id_tempo e data_carga calculados na projeção final, que já
+        # descarta sale_date; ids e quantidades são INTEGER no DW
         df_final = df_items.select([
-            "id_venda", "id_tempo", "id_loja", "id_cliente",
-            "id_produto", "quantidade", "valor_unitario", "custo_unitario",
-            "valor_total", "custo_total", "lucro", "margem_lucro", "data_carga"
+            pl.col("id_venda").cast(pl.Int32),
+            self._id_tempo(df_items, "sale_date"),
+            pl.col("id_loja", "id_cliente", "id_produto", "quantidade").cast(pl.Int32),
+            "valor_unitario", "custo_unitario",
+            "valor_total", "custo_total", "lucro", "margem_lucro",
+            _data_carga_expr(self.data_carga),
         ])
 
-        logger.info(f"✓ Vendas transformed: {len(df_final)} rows")
-
         return df_final
 
     def transform_estoque(self) -> pl.DataFrame:
@@ -469,6 +593,13 @@ class FactTransformer:
         """
         logger.info("Transforming estoque fact...")
 
+        df_final = self.build_estoque().collect(engine="streaming")
+
+        logger.info(f"✓ Estoque transformed: {len(df_final)} rows")
+        return df_final
+
+    def build_estoque(self) -> pl.LazyFrame:
+        """Lazy plan behind transform_estoque, not yet collected."""
         df_estoque = self._read_bronze_entity("estoque")
         df_produtos = self._read_bronze_entity("produtos")
 
@@ -486,9 +617,20 @@ class FactTransformer:
             )
         )
 
+        # ordena por partição e data: o snapshot anterior passa a ser a linha
+        # de cima, sem agrupamento por hash (over)
+        chaves = ["id_loja", "id_produto"]
+        df = df.sort([*chaves, "updated_at"], maintain_order=True)
+        inicio_particao = pl.any_horizontal(
+            [pl.col(c).ne_missing(pl.col(c).shift(1)) for c in chaves]
+        )
+
         # calcula quantidade inicial (último snapshot), final e delta por partição
         df = df.with_columns([
-            pl.col("quantidade_total").shift(1).over(["id_loja", "id_produto"]).alias("quantidade_inicial"),
+            pl.when(inicio_particao)
+              .then(None)
+              .otherwise(pl.col("quantidade_total").shift(1))
+              .alias("quantidade_inicial"),
             pl.col("quantidade_total").alias("quantidade_final"),
         ]).with_columns([
             (pl.col("quantidade_final") - pl.col("quantidade_inicial")).alias("delta_quantidade"),
@@ -504,6 +646,10 @@ class FactTransformer:
                 pl.col("id").alias("id_produto"),
                 pl.col("cost_price").alias("cost_price_prod")
             )
+            # só produtos presentes no estoque entram na tabela hash do join
+            prod_cost = prod_cost.join(
+                df.select("id_produto").unique(), on="id_produto", how="semi"
+            )
             df = df.join(prod_cost, on="id_produto", how="left")
         else:
             df = df.with_columns(pl.lit(0.0).alias("cost_price_prod"))
@@ -515,17 +661,21 @@ class FactTransformer:
 
         # id_tempo e data_carga
         df = self._add_id_tempo(df, "updated_at")
-        df = df.with_columns(pl.lit(datetime.now()).alias("data_carga"))
+        df = df.with_columns(_data_carga_expr(self.data_carga))
 
         df_final = df.select([
             "id_estoque", "id_tempo", "id_loja", "id_produto",
             "quantidade_inicial", "quantidade_final",
             "valor_inicial", "valor_final",
             "entrada", "saida", "data_carga"
-        ])
+        ]).with_columns(
+            # ids e quantidades são INTEGER no DW
+            pl.col(
+                "id_estoque", "id_loja", "id_produto",
+                "quantidade_inicial", "quantidade_final", "entrada", "saida"
+            ).cast(pl.Int32)
+        )
 
-        logger.info(f"✓ Estoque transformed: {len(df_final)} rows")
-        
         return df_final
 
     def transform_distribuicoes(self) -> pl.DataFrame:
@@ -541,6 +691,13 @@ class FactTransformer:
         """
         logger.info("Transforming distribuicoes fact...")
 
+        df_transformed = self.build_distribuicoes().collect(engine="streaming")
+
+        logger.info(f"✓ Distribuicoes transformed: {len(df_transformed)} rows")
+        return df_transformed
+
+    def build_distribuicoes(self) -> pl.LazyFrame:
+        """Lazy plan behind transform_distribuicoes, not yet collected."""
         df_distribuicoes = self._read_bronze_entity("distribuicao_interna")
 
         if df_distribuicoes is None:
@@ -553,7 +710,7 @@ class FactTransformer:
                 pl.col("from_store_id").alias("id_loja_origem"),
                 pl.col("to_store_id").alias("id_loja_destino"),
                 pl.col("distribution_date"),
-                pl.col("status").alias("status_distribuicao")
+                pl.col("status").cast(pl.Categorical).alias("status_distribuicao")
             )
         )
 
@@ -562,13 +719,12 @@ class FactTransformer:
 
         df_items = (
             df_distribuicoes
+            .select(pl.col("id").alias("id_distribuicao"), "items")
             .explode("items")
-            .with_columns([
-                pl.col("items").struct.field("product_id").alias("id_produto"),
-                pl.col("items").struct.field("quantity").alias("quantidade")
-            ])
+            .unnest("items")
+            .rename({"product_id": "id_produto", "quantity": "quantidade"})
             .select(
-                pl.col("id").alias("id_distribuicao"),
+                "id_distribuicao",
                 "id_produto",
                 "quantidade"
             )
@@ -582,7 +738,7 @@ class FactTransformer:
                 how="left"
             )
             .with_columns(
-                pl.lit(datetime.now()).alias("data_carga")
+                _data_carga_expr(self.data_carga)
             )
             .select(
                 "id_distribuicao",
@@ -594,8 +750,13 @@ class FactTransformer:
                 "status_distribuicao",
                 "data_carga",
             )
+            .with_columns(
+                # ids e quantidades são INTEGER no DW
+                pl.col(
+                    "id_distribuicao", "id_loja_origem", "id_loja_destino",
+                    "id_produto", "quantidade"
+                ).cast(pl.Int32)
+            )
         )
 
-        logger.info(f"✓ Distribuicoes transformed: {len(df_transformed)} rows")
-
         return df_transformed
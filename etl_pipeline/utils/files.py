@@ -0,0 +1,25 @@
+import os
+from pathlib import Path
+from typing import Optional, Union
+
+
+def latest_parquet_file(entity_dir: Union[str, Path]) -> Optional[os.DirEntry]:
+    """
+    Retorna o arquivo parquet mais recente de uma entidade do bronze.
+
+    Os nomes dos arquivos embutem um timestamp %Y%m%d_%H%M%S, então o maior
+    nome em ordem lexicográfica é o mais recente; nenhum stat() é necessário.
+    Bronze e silver usam esta mesma ordem para escolher o arquivo.
+
+    Args:
+        entity_dir: Diretório da entidade
+
+    Returns:
+        DirEntry do arquivo mais recente, ou None se não houver parquet
+    """
+    with os.scandir(entity_dir) as it:
+        return max(
+            (e for e in it if e.name.endswith(".parquet") and e.is_file()),
+            key=lambda e: e.name,
+            default=None,
+        )
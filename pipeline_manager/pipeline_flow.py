@@ -1,32 +1,43 @@
-from prefect import flow, task
+from prefect import allow_failure, flow, get_run_logger, task, unmapped
+from prefect.cache_policies import NO_CACHE
 from etl_pipeline.bronze_layer.bronze_pipeline import BronzePipeline
+from etl_pipeline.extract.extract_api import ENDPOINTS
 from etl_pipeline.silver_layer.silver_pipeline import SilverPipeline
 from etl_pipeline.load.load_pipeline import LoadPipeline, _get_project_root
 
+# The pipelines are shared by every task of a run, so they are not hashed
+# into cache keys (NO_CACHE). Concurrent silver tasks only read the run's
+# data_carga and write distinct keys of the shared caches/results.
+
 @task(
-        task_run_name="bronze_layer_task", 
-        retries=3, 
-        retry_delay_seconds=[3, 5, 10], 
+        task_run_name="bronze_{entity_name}_task",
+        retries=3,
+        retry_delay_seconds=[3, 5, 10],
         timeout_seconds=60,
-        log_prints=True
+        log_prints=True,
+        cache_policy=NO_CACHE
 )
-def extract_data():
-    bronze_int = BronzePipeline()
-
-    bronze_int.run_full_extraction()
-    bronze_int.generate_report()
+def extract_entity(bronze_int: BronzePipeline, entity_name: str):
+    return bronze_int.run_entity_extraction(entity_name)
 
 @task(
-        task_run_name="silver_layer_task",
+        task_run_name="silver_{name}_task",
         retries=2,
         retry_delay_seconds=[1, 3],
         timeout_seconds= 30,
-        log_prints=True
+        log_prints=True,
+        cache_policy=NO_CACHE
 )
-def transform_data():
-    silver_init = SilverPipeline()
+def transform_entity(silver_init: SilverPipeline, name: str):
+    return silver_init.run_single_transformation(name)
 
-    silver_init.run_full_transformation()
+@task(
+        task_run_name="layer_reports_task",
+        log_prints=True,
+        cache_policy=NO_CACHE
+)
+def generate_reports(bronze_int: BronzePipeline, silver_init: SilverPipeline):
+    bronze_int.generate_report()
     silver_init.generate_report()
 
 @task(
@@ -39,14 +50,50 @@ def load_data():
     project_root = _get_project_root()
 
     loader = LoadPipeline(project_root)
-    loader.load_all()
+    try:
+        loader.load_all()
+    finally:
+        loader.close()
 
 
 @flow(flow_run_name="systock_etl")
 def main():
-    task_bronze = extract_data()
-    task_silver = transform_data(wait_for=[task_bronze])
-    load_data(wait_for=[task_silver])
+    bronze_int = BronzePipeline()
+    silver_init = SilverPipeline()
+
+    # One task per endpoint; each silver entity starts as soon as the bronze
+    # entities it reads are written, instead of after the whole extraction
+    entity_names = list(ENDPOINTS)
+    extracted = dict(zip(
+        entity_names,
+        extract_entity.map(unmapped(bronze_int), entity_names)
+    ))
+
+    manager = silver_init.manager
+    # Every silver table of the run carries the same data_carga, as with
+    # transform_all; it is cleared only after every transform has finished
+    with manager.run_timestamp():
+        transformed = {
+            name: transform_entity.submit(
+                silver_init,
+                name,
+                wait_for=[extracted[source] for source in manager.SOURCES[name]]
+            )
+            for name in list(manager.DIMENSIONS) + list(manager.FACTS)
+        }
+        for future in transformed.values():
+            future.wait()
+
+    # As in run_full_transformation, a failed entity does not stop the others:
+    # the load still runs and that table keeps its previous silver output
+    failed = [name for name, future in transformed.items() if not future.state.is_completed()]
+    if failed:
+        get_run_logger().warning("Silver transforms failed, loading previous output: %s", failed)
+
+    settled = [allow_failure(future) for future in transformed.values()]
+    reports = generate_reports.submit(bronze_int, silver_init, wait_for=settled)
+    load_data.submit(wait_for=settled).result()
+    reports.wait()
 
 if __name__ == '__main__':
-    main.serve(name="daily-midnight", cron="0 0 * * 1-6")
\ No newline at end of file
+    main.serve(name="daily-midnight", cron="0 0 * * 1-6")
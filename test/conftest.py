@@ -0,0 +1,35 @@
+"""
+Shared pytest configuration for the test suite.
+
+The test classes share no state, so the suite can run in parallel with
+pytest-xdist (``pytest -n auto``). Each process gets its own scratch root,
+made the default ``tempfile`` directory, so the temporary directories the
+test classes create never collide across workers.
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+
+def _scratch_base() -> Path:
+    """tmpfs when available; the tests only write small files."""
+    shm = Path("/dev/shm")
+    return shm if shm.is_dir() else Path(tempfile.gettempdir())
+
+
+def pytest_configure(config):
+    """Create this worker's scratch root before the test modules are imported."""
+    worker_id = os.environ.get("PYTEST_XDIST_WORKER", "master")
+    root = tempfile.mkdtemp(prefix=f"systock_tests_{worker_id}_", dir=_scratch_base())
+    config.systock_tmp_root = root
+    tempfile.tempdir = root
+
+
+def pytest_unconfigure(config):
+    """Remove this worker's scratch root."""
+    root = getattr(config, "systock_tmp_root", None)
+    if root is not None:
+        tempfile.tempdir = None
+        shutil.rmtree(root, ignore_errors=True)
@@ -2,11 +2,15 @@
 Testes para a Bronze Layer
 """
 
+import functools
+import os
+import shutil
 import unittest
 from unittest.mock import Mock, patch
 from pathlib import Path
 import tempfile
 import polars as pl
+import pyarrow as pa
 from datetime import datetime
 
 import sys
@@ -16,54 +20,56 @@ from etl_pipeline.bronze_layer.bronze_manager import BronzeLayerManager
 from etl_pipeline.extract.extract_api import validate_data
 
 
+# Payloads compartilhados pelos testes (não são modificados pela ingestão)
+_SAMPLE_CLIENTES = {
+    'data': [
+        {'id': 1, 'name': 'Cliente 1'},
+        {'id': 2, 'name': 'Cliente 2'}
+    ]
+}
+_SAMPLE_IDS = {'data': [{'id': 1}]}
+
+
+@functools.lru_cache(maxsize=None)
+def _sample_frame() -> pl.DataFrame:
+    """DataFrame de _SAMPLE_CLIENTES, construído uma única vez"""
+    return pl.DataFrame(_SAMPLE_CLIENTES['data'])
+
+
+def _write_sample_parquet(path: Path) -> Path:
+    """Grava um parquet de exemplo em `path`, sem passar pela ingestão"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _sample_frame().write_parquet(path)
+    return path
+
+
 class TestBronzeLayerManager(unittest.TestCase):
     """Testes para BronzeLayerManager"""
     
+    @classmethod
+    def setUpClass(cls):
+        """Diretório raiz compartilhado pelos testes da classe"""
+        cls._root = Path(tempfile.mkdtemp())
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Remove o diretório raiz da classe"""
+        shutil.rmtree(cls._root, ignore_errors=True)
+    
     def setUp(self):
         """Configuração antes de cada teste"""
-        self.temp_dir = tempfile.TemporaryDirectory()
-        self.bronze = BronzeLayerManager(self.temp_dir.name)
-    
-    def tearDown(self):
-        """Limpeza após cada teste"""
-        self.temp_dir.cleanup()
+        # Cada teste usa um subdiretório próprio da raiz da classe
+        self.temp_dir_path = self._root / self._testMethodName
+        self.bronze = BronzeLayerManager(str(self.temp_dir_path))
     
     def test_initialization(self):
         """Testa inicialização do gerenciador"""
         self.assertIsNotNone(self.bronze.base_path)
         self.assertTrue(self.bronze.base_path.exists())
     
-    def test_validate_empty_data(self):
-        """Testa validação com dados vazios"""
-        result = self.bronze.validate_raw_data({})
-        self.assertFalse(result)
-    
-    def test_validate_invalid_type(self):
-        """Testa validação com tipo inválido"""
-        result = self.bronze.validate_raw_data("invalid")
-        self.assertFalse(result)
-    
-    def test_validate_valid_data(self):
-        """Testa validação com dados válidos"""
-        valid_data = {
-            'data': [
-                {'id': 1, 'name': 'Cliente 1'},
-                {'id': 2, 'name': 'Cliente 2'}
-            ]
-        }
-        result = self.bronze.validate_raw_data(valid_data)
-        self.assertTrue(result)
-    
     def test_ingest_data_success(self):
         """Testa ingestão bem-sucedida de dados"""
-        data = {
-            'data': [
-                {'id': 1, 'name': 'Cliente 1'},
-                {'id': 2, 'name': 'Cliente 2'}
-            ]
-        }
-        
-        result = self.bronze.ingest_data(data, 'clientes')
+        result = self.bronze.ingest_data(_SAMPLE_CLIENTES, 'clientes')
         
         self.assertIsNotNone(result)
         self.assertTrue(Path(result).exists())
@@ -89,8 +95,7 @@ class TestBronzeLayerManager(unittest.TestCase):
     
     def test_get_latest_file(self):
         """Testa obtenção do arquivo mais recente"""
-        data = {'data': [{'id': 1, 'name': 'Test'}]}
-        self.bronze.ingest_data(data, 'clientes')
+        self.bronze.ingest_data(_SAMPLE_CLIENTES, 'clientes')
         
         latest = self.bronze.get_latest_file('clientes')
         self.assertIsNotNone(latest)
@@ -103,11 +108,7 @@ class TestBronzeLayerManager(unittest.TestCase):
     
     def test_read_latest_data(self):
         """Testa leitura de dados mais recentes"""
-        data = {'data': [
-            {'id': 1, 'name': 'Test 1'},
-            {'id': 2, 'name': 'Test 2'}
-        ]}
-        self.bronze.ingest_data(data, 'clientes')
+        self.bronze.ingest_data(_SAMPLE_CLIENTES, 'clientes')
         
         df = self.bronze.read_latest_data('clientes')
         
@@ -123,9 +124,8 @@ class TestBronzeLayerManager(unittest.TestCase):
     
     def test_list_entities(self):
         """Testa listagem de entidades"""
-        data = {'data': [{'id': 1}]}
-        self.bronze.ingest_data(data, 'clientes')
-        self.bronze.ingest_data(data, 'produtos')
+        self.bronze.ingest_data(_SAMPLE_IDS, 'clientes')
+        self.bronze.ingest_data(_SAMPLE_IDS, 'produtos')
         
         entities = self.bronze.list_entities()
         
@@ -135,11 +135,7 @@ class TestBronzeLayerManager(unittest.TestCase):
     
     def test_get_entity_statistics(self):
         """Testa obtenção de estatísticas"""
-        data = {'data': [
-            {'id': 1, 'name': 'Test 1'},
-            {'id': 2, 'name': 'Test 2'}
-        ]}
-        self.bronze.ingest_data(data, 'clientes')
+        self.bronze.ingest_data(_SAMPLE_CLIENTES, 'clientes')
         
         stats = self.bronze.get_entity_statistics('clientes')
         
@@ -149,11 +145,13 @@ class TestBronzeLayerManager(unittest.TestCase):
     
     def test_cleanup_old_files(self):
         """Testa limpeza de arquivos antigos"""
-        data = {'data': [{'id': 1}]}
-        
-        # Criar 3 arquivos
-        for i in range(3):
-            self.bronze.ingest_data(data, 'clientes')
+        # Criar 3 arquivos: um de exemplo e duas cópias com outros nomes
+        # (a limpeza só depende da ordem dos nomes)
+        first = _write_sample_parquet(
+            self.bronze.base_path / 'clientes' / 'clientes_20240101_000000.parquet'
+        )
+        for i in range(2):
+            shutil.copy(first, first.with_name(f"{first.stem}_dup{i}.parquet"))
         
         # Manter apenas 1
         removed = self.bronze.cleanup_old_files('clientes', keep_count=1)
@@ -161,28 +159,141 @@ class TestBronzeLayerManager(unittest.TestCase):
         self.assertEqual(removed, 2)
         
         # Verificar que apenas 1 arquivo permanece
-        files = list((self.bronze.base_path / 'clientes').glob('*.parquet'))
+        with os.scandir(self.bronze.base_path / 'clientes') as entries:
+            files = [entry.name for entry in entries if entry.name.endswith('.parquet')]
         self.assertEqual(len(files), 1)
+        
+        # O arquivo mantido é o de maior nome (o mais recente)
+        self.assertEqual(files, ['clientes_20240101_000000_dup1.parquet'])
+    
+    def test_repeated_ingest_distinct_files(self):
+        """Testa que ingestões seguidas geram arquivos distintos"""
+        first = self.bronze.ingest_data(_SAMPLE_CLIENTES['data'], 'clientes')
+        second = self.bronze.ingest_data(_SAMPLE_CLIENTES['data'], 'clientes')
+        
+        self.assertIsNotNone(first)
+        self.assertIsNotNone(second)
+        self.assertNotEqual(first, second)
+        
+        files = sorted(p.name for p in (self.bronze.base_path / 'clientes').glob('clientes_raw_*.parquet'))
+        self.assertEqual(files, sorted([Path(first).name, Path(second).name]))
+        
+        # O segundo arquivo é o mais recente na ordem dos nomes
+        self.assertEqual(self.bronze._get_latest_file('clientes'), Path(second))
+    
+    def test_two_managers_distinct_files(self):
+        """Testa que dois gerenciadores no mesmo diretório não sobrescrevem arquivos"""
+        other = BronzeLayerManager(str(self.temp_dir_path))
+        
+        with patch('etl_pipeline.bronze_layer.bronze_manager.datetime') as mock_datetime:
+            mock_datetime.now.return_value = datetime(2024, 1, 1, 12, 0, 0)
+            first = self.bronze.ingest_data(_SAMPLE_CLIENTES['data'], 'clientes')
+            second = other.ingest_data(_SAMPLE_CLIENTES['data'], 'clientes')
+        
+        self.assertNotEqual(first, second)
+        self.assertEqual(len(list((self.bronze.base_path / 'clientes').glob('*.parquet'))), 2)
+        
+        # pid com 7 dígitos: a ordem dos nomes não depende do tamanho do pid
+        self.assertRegex(Path(first).name, r'^clientes_raw_20240101_120000_\d{7}_\d{6}\.parquet$')
+    
+    def test_persistent_writer_file_hidden_until_closed(self):
+        """Testa que o arquivo de um writer aberto só é visível após close_writers"""
+        finished = _write_sample_parquet(
+            self.temp_dir_path / 'clientes' / 'clientes_raw_20240101_000000.parquet'
+        )
+        bronze = BronzeLayerManager(str(self.temp_dir_path), persistent_writers=True)
+        entity_dir = bronze.base_path / 'clientes'
+        
+        first = bronze.ingest_data(_SAMPLE_CLIENTES['data'], 'clientes')
+        second = bronze.ingest_data(_SAMPLE_CLIENTES['data'], 'clientes')
+        
+        # Mesmo arquivo, ainda sem rodapé: os leitores continuam no anterior
+        self.assertEqual(first, second)
+        self.assertFalse(Path(first).exists())
+        self.assertTrue(Path(first + '.inprogress').exists())
+        self.assertEqual(bronze._get_latest_file('clientes'), finished)
+        
+        bronze.close_writers()
+        
+        self.assertEqual(list(entity_dir.glob('*.inprogress')), [])
+        self.assertEqual(bronze._get_latest_file('clientes'), Path(first))
+        self.assertEqual(pl.read_parquet(first).height, 2 * len(_SAMPLE_CLIENTES['data']))
+    
+    def test_ingest_with_schema(self):
+        """Testa que ingest_data com schema grava só registros válidos"""
+        schema = pa.schema([pa.field('id', pa.int64(), nullable=False), pa.field('name', pa.string())])
+        
+        path = self.bronze.ingest_data(_SAMPLE_CLIENTES['data'], 'clientes', schema=schema)
+        rejected = self.bronze.ingest_data([{'id': 1, 'extra': True}], 'clientes', schema=schema)
+        
+        self.assertIsNotNone(path)
+        self.assertEqual(pl.read_parquet(path)['id'].to_list(), [1, 2])
+        self.assertIsNone(rejected)
+
+
+class TestValidateRawData(unittest.TestCase):
+    """Testes para BronzeLayerManager.validate_raw_data (sem estado por teste)"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Um único gerenciador para todos os casos"""
+        cls._root = tempfile.mkdtemp()
+        cls.bronze = BronzeLayerManager(cls._root)
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Remove o diretório do gerenciador"""
+        shutil.rmtree(cls._root, ignore_errors=True)
+    
+    def test_validate_cases(self):
+        """Testa validação com dados vazios, tipo inválido e dados válidos"""
+        valid_data = {
+            'data': [
+                {'id': 1, 'name': 'Cliente 1'},
+                {'id': 2, 'name': 'Cliente 2'}
+            ]
+        }
+        cases = [({}, False), ("invalid", False), (valid_data, True)]
+        
+        for data, expected in cases:
+            with self.subTest(case=data):
+                self.assertEqual(self.bronze.validate_raw_data(data), expected)
+
+    
+    def test_validate_records_against_schema(self):
+        """Testa a validação dos registros contra um schema esperado"""
+        schema = pa.schema([
+            pa.field('id', pa.int64(), nullable=False),
+            pa.field('name', pa.string()),
+        ])
+        cases = [
+            ("válido", [{'id': 1, 'name': 'A'}, {'id': 2}], True),
+            ("campo extra", [{'id': 1, 'name': 'A', 'email': 'a@x.com'}], False),
+            ("obrigatório ausente", [{'name': 'A'}], False),
+            ("obrigatório nulo", [{'id': None, 'name': 'A'}], False),
+            ("tipo errado", [{'id': 'um', 'name': 'A'}], False),
+        ]
+        
+        for label, records, expected in cases:
+            with self.subTest(case=label):
+                table = self.bronze.validate_records(records, schema)
+                self.assertEqual(table is not None, expected)
+                self.assertEqual(self.bronze.validate_raw_data(records, schema), expected)
+                if expected:
+                    self.assertEqual(table.schema, schema)
+                    self.assertEqual(table.column('name').to_pylist(), ['A', None])
 
 
 class TestValidateData(unittest.TestCase):
     """Testes para função validate_data"""
     
-    def test_validate_valid_data(self):
-        """Testa validação de dados válidos"""
-        data = {'data': [{'id': 1}]}
-        result = validate_data(data)
-        self.assertTrue(result)
-    
-    def test_validate_empty_data(self):
-        """Testa validação de dados vazios"""
-        result = validate_data({})
-        self.assertFalse(result)
-    
-    def test_validate_invalid_type(self):
-        """Testa validação com tipo inválido"""
-        result = validate_data("invalid")
-        self.assertFalse(result)
+    def test_validate_cases(self):
+        """Testa validação de dados válidos, vazios e de tipo inválido"""
+        cases = [({'data': [{'id': 1}]}, True), ({}, False), ("invalid", False)]
+        
+        for data, expected in cases:
+            with self.subTest(case=data):
+                self.assertEqual(validate_data(data), expected)
 
 
 if __name__ == '__main__':
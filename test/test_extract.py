@@ -0,0 +1,317 @@
+"""
+Testes para a extração (save_as_parquet e cache HTTP)
+"""
+
+import asyncio
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
+import orjson
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from etl_pipeline.extract import extract_api
+from etl_pipeline.extract.extract_api import get_cached_etag, save_as_parquet
+
+
+class TestSaveAsParquet(unittest.TestCase):
+    """Testes para save_as_parquet"""
+
+    def setUp(self):
+        """Configuração antes de cada teste"""
+        self.output_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        """Limpeza após cada teste"""
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def assertNoTempFiles(self):
+        """Nenhum .parquet.tmp deixado para trás"""
+        self.assertEqual(list(self.output_dir.glob("*.tmp")), [])
+
+    def test_empty_payload(self):
+        """Testa que um payload sem registros gera um arquivo vazio"""
+        path = save_as_parquet({'data': []}, "vazio", output_dir=self.output_dir)
+
+        self.assertEqual(path, str(self.output_dir / "vazio.parquet"))
+        self.assertEqual(pq.read_table(path).num_rows, 0)
+        self.assertNoTempFiles()
+
+    def test_schema_varying_payload(self):
+        """Testa chunks com colunas diferentes (conversão em uma passada)"""
+        records = [
+            {'id': 1, 'name': 'A'},
+            {'id': 2, 'name': 'B'},
+            {'id': 3},
+            {'id': 4, 'name': 'D', 'email': 'd@x.com'},
+        ]
+
+        with patch.object(extract_api, "RAW_ROW_GROUP_SIZE", 2):
+            path = save_as_parquet({'data': records}, "variado", output_dir=self.output_dir)
+
+        self.assertIsNotNone(path)
+        table = pq.read_table(path)
+        self.assertEqual(table.num_rows, 4)
+        self.assertEqual(set(table.column_names), {'id', 'name', 'email'})
+        self.assertEqual(table.column('name').to_pylist(), ['A', 'B', None, 'D'])
+        self.assertNoTempFiles()
+
+    def test_missing_columns_in_later_chunk(self):
+        """Testa que colunas ausentes em chunks seguintes viram nulos"""
+        records = [{'id': 1, 'name': 'A'}, {'id': 2, 'name': 'B'}, {'id': 3}]
+
+        with patch.object(extract_api, "RAW_ROW_GROUP_SIZE", 2):
+            path = save_as_parquet({'data': records}, "faltando", output_dir=self.output_dir)
+
+        table = pq.read_table(path)
+        self.assertEqual(table.num_rows, 3)
+        self.assertEqual(table.column('name').to_pylist(), ['A', 'B', None])
+
+    def test_failed_write_leaves_no_temp_file(self):
+        """Testa que uma escrita com falha não deixa .parquet.tmp"""
+        def partial_write(records, file_path, metadata, write_options):
+            Path(file_path).write_bytes(b"PAR1")
+            raise pa.ArrowInvalid("chunk inválido")
+
+        with patch.object(extract_api, "_stream_to_parquet", side_effect=partial_write), \
+                patch.object(extract_api, "_records_to_arrow", side_effect=pa.ArrowInvalid("falhou")):
+            path = save_as_parquet({'data': [{'id': 1}]}, "falha", output_dir=self.output_dir)
+
+        self.assertIsNone(path)
+        self.assertFalse((self.output_dir / "falha.parquet").exists())
+        self.assertNoTempFiles()
+
+    def test_dict_payload_without_data_key(self):
+        """Testa um dict sem a chave 'data' (convertido como colunas, como antes)"""
+        path = save_as_parquet({'clients': [{'a': 1}]}, "sem_data", output_dir=self.output_dir)
+
+        self.assertIsNotNone(path)
+        table = pq.read_table(path)
+        self.assertEqual(table.num_rows, 1)
+        self.assertEqual(table.column('clients').to_pylist(), [{'a': 1}])
+
+    def test_iso_dates_stay_strings(self):
+        """Testa que datas ISO ficam como texto, com ou sem frações de segundo"""
+        for label, dates in (
+            ("segundos", ['2024-01-01T10:00:00', '2024-01-02T11:00:00']),
+            ("frações", ['2024-01-01T10:00:00', '2024-01-02T11:00:00.500']),
+        ):
+            with self.subTest(datas=label):
+                records = [{'id': i, 'created_at': d} for i, d in enumerate(dates)]
+
+                path = save_as_parquet({'data': records}, f"datas_{label}", output_dir=self.output_dir)
+
+                table = pq.read_table(path)
+                self.assertEqual(table.column_names, ['id', 'created_at'])
+                self.assertEqual(table.schema.field('created_at').type, pa.string())
+                self.assertEqual(table.column('created_at').to_pylist(), dates)
+
+    def test_raw_json_array_body(self):
+        """Testa corpos JSON (array) abaixo e acima de POLARS_JSON_MIN_BYTES"""
+        record = {'id': 1, 'name': 'Cliente'}
+        record_size = len(orjson.dumps(record)) + 1
+        threshold = extract_api.POLARS_JSON_MIN_BYTES
+
+        for label, n_records in (
+            ("abaixo", threshold // record_size - 1),
+            ("acima", threshold // record_size + 1),
+        ):
+            body = orjson.dumps([record] * n_records)
+            with self.subTest(tamanho=label, bytes=len(body)):
+                self.assertEqual(len(body) < threshold, label == "abaixo")
+
+                path = save_as_parquet(body, f"array_{label}", output_dir=self.output_dir)
+
+                self.assertIsNotNone(path)
+                self.assertEqual(pq.read_table(path).num_rows, n_records)
+
+    def test_raw_json_object_body(self):
+        """Testa corpos {'data': [...]} grandes, lidos pelo Polars"""
+        records = [
+            {'id': i, 'created_at': '2024-01-01T10:00:00'}
+            for i in range(extract_api.POLARS_JSON_MIN_BYTES // 40)
+        ]
+        # Campo que só aparece no fim dos registros
+        records[-1]['extra'] = 1.5
+        body = orjson.dumps({'data': records, 'total_pages': 1})
+        self.assertGreaterEqual(len(body), extract_api.POLARS_JSON_MIN_BYTES)
+
+        self.assertIsInstance(extract_api._parse_body(body), pa.Table)
+        path = save_as_parquet(body, "objeto", output_dir=self.output_dir)
+
+        table = pq.read_table(path)
+        self.assertEqual(table.num_rows, len(records))
+        self.assertEqual(table.column_names, ['id', 'created_at', 'extra'])
+        self.assertIn(table.schema.field('created_at').type, (pa.string(), pa.large_string()))
+        self.assertEqual(table.column('extra').to_pylist()[-2:], [None, 1.5])
+
+
+
+class TestHttpCache(unittest.TestCase):
+    """Testes para o cache de respostas (ETag / 304) de _fetch"""
+
+    URL = "https://api.example.com/clientes"
+    BODY = orjson.dumps({'data': [{'id': 1, 'name': 'Cliente 1'}]})
+
+    def setUp(self):
+        """Diretório de cache temporário, com o cache habilitado"""
+        self.cache_dir = Path(tempfile.mkdtemp())
+        patch.object(extract_api, "HTTP_CACHE_DIR", self.cache_dir).start()
+        patch.object(extract_api, "HTTP_CACHE_ENABLED", True).start()
+        self.addCleanup(patch.stopall)
+        self.requests = []
+
+    def tearDown(self):
+        """Limpeza após cada teste"""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def _fetch(self, handler):
+        """Executa _fetch com um cliente httpx cujas respostas vêm de `handler`"""
+        def record(request):
+            self.requests.append(request)
+            return handler(request)
+
+        async def run():
+            transport = httpx.MockTransport(record)
+            async with httpx.AsyncClient(transport=transport) as client:
+                return await extract_api._fetch(client, asyncio.Semaphore(1), self.URL)
+
+        return asyncio.run(run())
+
+    def _server(self, headers):
+        """Servidor falso: 304 quando o ETag enviado é o atual, senão o corpo"""
+        def handler(request):
+            if headers.get("ETag") and request.headers.get("If-None-Match") == headers["ETag"]:
+                return httpx.Response(304)
+            return httpx.Response(200, content=self.BODY, headers=headers)
+        return handler
+
+    def test_not_modified_uses_cached_body(self):
+        """Testa que um 304 devolve o corpo guardado na resposta anterior"""
+        handler = self._server({"ETag": '"v1"'})
+
+        first = self._fetch(handler)
+        self.assertEqual(get_cached_etag(self.URL), '"v1"')
+        second = self._fetch(handler)
+
+        self.assertEqual(self.requests[1].headers.get("If-None-Match"), '"v1"')
+        self.assertEqual(second, first)
+        self.assertEqual(second, orjson.loads(self.BODY))
+
+    def test_response_without_validators_not_cached(self):
+        """Testa que respostas sem ETag/Last-Modified não são guardadas"""
+        handler = self._server({})
+
+        self._fetch(handler)
+        self._fetch(handler)
+
+        self.assertNotIn("If-None-Match", self.requests[1].headers)
+        self.assertIsNone(get_cached_etag(self.URL))
+        self.assertEqual(list(self.cache_dir.iterdir()), [])
+
+    def test_cache_disabled(self):
+        """Testa que nada é guardado nem enviado com o cache desabilitado"""
+        handler = self._server({"ETag": '"v1"'})
+
+        with patch.object(extract_api, "HTTP_CACHE_ENABLED", False):
+            self._fetch(handler)
+            second = self._fetch(handler)
+
+            self.assertNotIn("If-None-Match", self.requests[1].headers)
+            self.assertIsNone(get_cached_etag(self.URL))
+        self.assertEqual(second, orjson.loads(self.BODY))
+
+    def test_retries_server_errors(self):
+        """Testa que respostas 5xx são repetidas e 4xx não"""
+        statuses = iter([503, 200])
+
+        def handler(request):
+            return httpx.Response(next(statuses), content=self.BODY)
+
+        with patch.object(extract_api, "_retry_delay", return_value=0):
+            self.assertEqual(self._fetch(handler), orjson.loads(self.BODY))
+            self.assertEqual(len(self.requests), 2)
+
+            self.requests.clear()
+            self.assertIsNone(self._fetch(lambda request: httpx.Response(404)))
+            self.assertEqual(len(self.requests), 1)
+
+
+class TestPaginate(unittest.TestCase):
+    """Testes para a paginação por links `next`"""
+
+    URL = "https://api.example.com/clientes"
+
+    def _paginate(self, next_links):
+        """Executa paginate sobre páginas cujo `next` vem de `next_links`"""
+        self.requests = []
+
+        def handler(request):
+            self.requests.append(request)
+            page = int(request.url.params.get("page", 1))
+            return httpx.Response(200, content=orjson.dumps({
+                'data': [{'id': page}],
+                'next': next_links.get(page),
+            }))
+
+        async def run():
+            transport = httpx.MockTransport(handler)
+            async with httpx.AsyncClient(transport=transport) as client:
+                return await extract_api.paginate(client, asyncio.Semaphore(1), self.URL)
+
+        with patch.object(extract_api, "HTTP_CACHE_ENABLED", False):
+            return asyncio.run(run())
+
+    def test_follows_next_links(self):
+        """Testa que os links `next` são seguidos até o fim"""
+        data = self._paginate({1: f"{self.URL}?page=2", 2: f"{self.URL}?page=3"})
+        self.assertEqual(data, {'data': [{'id': 1}, {'id': 2}, {'id': 3}]})
+
+    def test_next_link_cycle(self):
+        """Testa que um `next` que volta a uma página anterior interrompe a paginação"""
+        data = self._paginate({1: f"{self.URL}?page=2", 2: self.URL})
+
+        self.assertIsNone(data)
+        self.assertEqual(len(self.requests), 2)
+
+    def test_page_limit(self):
+        """Testa o limite de páginas (MAX_PAGES)"""
+        next_links = {page: f"{self.URL}?page={page + 1}" for page in range(1, 10)}
+
+        with patch.object(extract_api, "MAX_PAGES", 3):
+            data = self._paginate(next_links)
+
+        self.assertIsNone(data)
+        self.assertEqual(len(self.requests), 3)
+
+
+class TestGetData(unittest.TestCase):
+    """Testes para get_data (wrapper síncrono do cliente assíncrono)"""
+
+    def test_fetches_every_page(self):
+        """Testa que get_data junta todas as páginas do endpoint"""
+        def handler(request):
+            page = int(request.url.params.get("page", 1))
+            return httpx.Response(200, content=orjson.dumps({
+                'data': [{'id': page}],
+                'total_pages': 2,
+            }))
+
+        def new_client():
+            return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        with patch.object(extract_api, "_new_client", new_client), \
+                patch.object(extract_api, "HTTP_CACHE_ENABLED", False):
+            data = extract_api.get_data("https://api.example.com/clientes")
+
+        self.assertEqual(data, {'data': [{'id': 1}, {'id': 2}]})
+
+if __name__ == "__main__":
+    unittest.main()
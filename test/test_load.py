@@ -0,0 +1,256 @@
+"""
+Load Tests - Unit tests for the load layer
+
+These tests need no database: they cover reading the silver tables and the
+SQL the loaders generate.
+"""
+
+import shutil
+import tempfile
+import unittest
+from contextlib import contextmanager
+from datetime import date, datetime
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import polars as pl
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from etl_pipeline.extract.extract_api import save_as_parquet
+from etl_pipeline.load import load_entities
+from etl_pipeline.load.load_entities import (
+    DIM_CLIENTE_UPSERT,
+    DIM_TEMPO_UPSERT,
+    FATO_DISTRIBUICOES_UPSERT,
+    FATO_ESTOQUE_UPSERT,
+    FATO_VENDAS_UPSERT,
+    LoadFacts,
+    ReadSilverParquet,
+    _upsert_statements,
+    build_dim_tempo,
+)
+from etl_pipeline.silver_layer.transformations import TEMPO_COLUMNS, tempo_attributes
+
+
+class TestReadSilverParquet(unittest.TestCase):
+    """Tests for ReadSilverParquet with single files and partitioned datasets."""
+
+    def setUp(self):
+        """Create a scratch silver directory."""
+        self.silver_dir = Path(tempfile.mkdtemp())
+        self.reader = ReadSilverParquet(self.silver_dir)
+
+    def tearDown(self):
+        """Remove the scratch silver directory."""
+        shutil.rmtree(self.silver_dir, ignore_errors=True)
+
+    def _save_vendas(self, records):
+        """Save records as a vendas dataset partitioned by sale_date."""
+        return save_as_parquet(
+            {'data': records}, "vendas",
+            output_dir=self.silver_dir,
+            partition_date_column="sale_date",
+        )
+
+    def test_partitioned_save_layout(self):
+        """Test one year=/month= partition is written per month."""
+        path = self._save_vendas([
+            {"id": 1, "sale_date": "2024-01-10T10:00:00"},
+            {"id": 2, "sale_date": "2024-02-15T11:00:00"},
+        ])
+
+        self.assertEqual(path, str(self.silver_dir / "vendas"))
+        partitions = sorted(
+            str(p.relative_to(path)) for p in Path(path).glob("year=*/month=*")
+        )
+        self.assertEqual(partitions, ["year=2024/month=1", "year=2024/month=2"])
+
+    def test_resave_replaces_only_its_month(self):
+        """Test re-saving a month replaces it and leaves other months intact."""
+        self._save_vendas([
+            {"id": 1, "sale_date": "2024-01-10T10:00:00"},
+            {"id": 2, "sale_date": "2024-02-15T11:00:00"},
+            {"id": 3, "sale_date": "2024-02-20T12:00:00"},
+        ])
+        self._save_vendas([{"id": 4, "sale_date": "2024-02-25T09:00:00"}])
+
+        df = self.reader.read("vendas", columns=["id", "month"]).sort("id")
+
+        self.assertEqual(df["id"].to_list(), [1, 4])
+        self.assertEqual(df["month"].to_list(), [1, 2])
+
+    def test_read_with_filters_and_columns(self):
+        """Test filters select partitions and columns set the output order."""
+        self._save_vendas([
+            {"id": 1, "sale_date": "2024-01-10T10:00:00"},
+            {"id": 2, "sale_date": "2024-02-15T11:00:00"},
+            {"id": 3, "sale_date": "2024-02-20T12:00:00"},
+            {"id": 4, "sale_date": "2025-02-01T08:00:00"},
+        ])
+
+        df = self.reader.read(
+            "vendas",
+            columns=["sale_date", "id"],
+            filters=[("year", "=", 2024), ("month", "=", 2)],
+        )
+
+        self.assertEqual(df.columns, ["sale_date", "id"])
+        self.assertEqual(sorted(df["id"].to_list()), [2, 3])
+
+    def test_read_single_file_with_filters(self):
+        """Test filters also apply to an unpartitioned table."""
+        pl.DataFrame({"id": [1, 2, 3]}).write_parquet(self.silver_dir / "dim_lojas.parquet")
+
+        df = self.reader.read("dim_lojas", filters=[("id", "in", [1, 3])])
+
+        self.assertEqual(df["id"].to_list(), [1, 3])
+
+    def test_read_missing_table(self):
+        """Test a missing table raises FileNotFoundError."""
+        with self.assertRaises(FileNotFoundError):
+            self.reader.read("nao_existe")
+
+
+class TestUpsertStatements(unittest.TestCase):
+    """Tests for the SQL built by _upsert_statements."""
+
+    def setUp(self):
+        """Build the statements of a small table."""
+        self.statements = _upsert_statements(
+            "analytics.fato_teste",
+            ["id_api", "valor", "data_carga"],
+            "id_api",
+            """
+            DO UPDATE SET
+                valor = EXCLUDED.valor
+            """,
+        )
+
+    def test_staging_table_numbers_rows(self):
+        """Test the staging table copies the target columns plus a _seq counter."""
+        self.assertEqual(
+            self.statements.create_staging,
+            "CREATE TEMP TABLE stg_fato_teste ON COMMIT DROP AS "
+            "SELECT id_api, valor, data_carga FROM analytics.fato_teste WITH NO DATA; "
+            "ALTER TABLE stg_fato_teste ADD COLUMN _seq BIGSERIAL",
+        )
+
+    def test_copy_targets_staging_table(self):
+        """Test COPY loads the staging table, not the target."""
+        self.assertEqual(
+            self.statements.copy,
+            "COPY stg_fato_teste (id_api, valor, data_carga) FROM STDIN WITH (FORMAT CSV)",
+        )
+
+    def test_merge_keeps_last_duplicate(self):
+        """Test the merge keeps one row per key: the last one copied."""
+        merge = self.statements.merge
+        self.assertIn("SELECT DISTINCT ON (id_api) id_api, valor, data_carga FROM stg_fato_teste", merge)
+        self.assertIn("ORDER BY id_api, _seq DESC", merge)
+        self.assertTrue(merge.startswith("INSERT INTO analytics.fato_teste (id_api, valor, data_carga) "))
+
+    def test_merge_on_conflict(self):
+        """Test the conflict action is appended to the key's ON CONFLICT."""
+        self.assertTrue(
+            self.statements.merge.endswith(
+                "ON CONFLICT (id_api) DO UPDATE SET\n                valor = EXCLUDED.valor"
+            )
+        )
+
+    def test_facts_update_data_carga_of_older_rows(self):
+        """Test fact upserts refresh data_carga and only overwrite older loads."""
+        for table, statements in (
+            ("fato_estoque", FATO_ESTOQUE_UPSERT),
+            ("fato_vendas", FATO_VENDAS_UPSERT),
+            ("fato_distribuicoes", FATO_DISTRIBUICOES_UPSERT),
+        ):
+            with self.subTest(table=table):
+                self.assertIn("data_carga = EXCLUDED.data_carga", statements.merge)
+                self.assertIn(
+                    f"WHERE analytics.{table}.data_carga < EXCLUDED.data_carga",
+                    statements.merge,
+                )
+
+    def test_dimension_conflicts(self):
+        """Test dim_cliente refreshes data_carga and dim_tempo keeps loaded days."""
+        self.assertIn("data_carga = EXCLUDED.data_carga", DIM_CLIENTE_UPSERT.merge)
+        self.assertTrue(DIM_TEMPO_UPSERT.merge.endswith("ON CONFLICT (id_tempo) DO NOTHING"))
+
+
+class TestBuildDimTempo(unittest.TestCase):
+    """Tests for the calendar generated by build_dim_tempo."""
+
+    def test_matches_silver_calendar(self):
+        """Test the generated days match the silver dim_tempo attributes."""
+        start, end = date(2024, 12, 28), date(2025, 1, 3)
+        silver = (
+            pl.DataFrame({"data": pl.datetime_range(
+                datetime(2024, 12, 28), datetime(2025, 1, 3), "1d", eager=True
+            )})
+            .with_columns(tempo_attributes(pl.col("data")))
+            .select(TEMPO_COLUMNS)
+        )
+
+        df = build_dim_tempo(start, end)
+
+        self.assertTrue(df.equals(silver))
+        self.assertEqual(df["id_tempo"].to_list()[:2], [20241228, 20241229])
+
+
+class FakeCursor:
+    """Records the statements executed and the CSV sent with COPY."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql):
+        self.calls.append(("execute", sql))
+
+    def copy_expert(self, sql, buffer, size):
+        self.calls.append(("copy", sql, buffer.read().decode()))
+
+
+class TestUpsertDf(unittest.TestCase):
+    """Tests for BaseLoader._upsert_df against a fake connection."""
+
+    def setUp(self):
+        """Route the loader's connection to a FakeCursor."""
+        self.cursor = FakeCursor()
+        connection = MagicMock()
+        connection.cursor.return_value = self.cursor
+
+        @contextmanager
+        def fake_conn(loader):
+            yield connection
+
+        patcher = patch.object(LoadFacts, "_get_conn", fake_conn)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.loader = LoadFacts(db_config={}, read_silver=MagicMock())
+
+    def test_staging_copy_then_merge(self):
+        """Test rows are copied in order, chunked, between staging and merge."""
+        statements = _upsert_statements("analytics.t", ["id", "valor"], "id", "DO NOTHING")
+        df = pl.DataFrame({"id": [1, 2, 1], "valor": [10, 20, 30]})
+
+        with patch.object(load_entities, "COPY_CHUNK_ROWS", 2):
+            self.loader._upsert_df(df, statements)
+
+        self.assertEqual(self.cursor.calls, [
+            ("execute", statements.create_staging),
+            ("copy", statements.copy, "1,10\n2,20\n"),
+            ("copy", statements.copy, "1,30\n"),
+            ("execute", statements.merge),
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
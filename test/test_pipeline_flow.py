@@ -0,0 +1,137 @@
+"""
+Pipeline Flow Tests - wiring of the Prefect flow
+
+The layers are replaced by fakes, so these tests only check how the flow
+orders and connects the per-entity tasks. They need Prefect installed.
+"""
+
+import importlib.util
+import itertools
+import threading
+import unittest
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from etl_pipeline.extract.extract_api import ENDPOINTS
+from etl_pipeline.silver_layer.silver_manager import SilverLayerManager
+
+HAS_PREFECT = importlib.util.find_spec("prefect") is not None
+
+
+class FakeBronzePipeline:
+    """Records when each entity was extracted."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.extracted = {}
+
+    def run_entity_extraction(self, entity_name):
+        self.extracted[entity_name] = next(self.clock)
+        return f"{entity_name}.parquet"
+
+    def generate_report(self):
+        return {}
+
+
+class FakeManager:
+    """Entity lists of the real manager plus a recording run_timestamp."""
+
+    DIMENSIONS = SilverLayerManager.DIMENSIONS
+    FACTS = SilverLayerManager.FACTS
+    SOURCES = SilverLayerManager.SOURCES
+
+    def __init__(self):
+        self.data_carga = None
+
+    @contextmanager
+    def run_timestamp(self, data_carga=None):
+        self.data_carga = data_carga or datetime.now()
+        try:
+            yield self.data_carga
+        finally:
+            self.data_carga = None
+
+
+class FakeSilverPipeline:
+    """Records each transform with its time and data_carga; one entity fails."""
+
+    failing = "estoque"
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.manager = FakeManager()
+        self.transformed = {}
+        self.lock = threading.Lock()
+
+    def run_single_transformation(self, name):
+        with self.lock:
+            self.transformed[name] = (next(self.clock), self.manager.data_carga)
+        if name == self.failing:
+            raise RuntimeError(f"{name} failed")
+        return 1
+
+    def generate_report(self):
+        return ""
+
+
+@unittest.skipUnless(HAS_PREFECT, "prefect is not installed")
+class TestPipelineFlow(unittest.TestCase):
+    """Tests for pipeline_flow.main."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Run the flow once against the fakes."""
+        from prefect.testing.utilities import prefect_test_harness
+        from pipeline_manager import pipeline_flow
+
+        clock = itertools.count()
+        cls.bronze = FakeBronzePipeline(clock)
+        cls.silver = FakeSilverPipeline(clock)
+        cls.loader_cls = MagicMock()
+
+        with prefect_test_harness(), \
+                patch.object(pipeline_flow, "BronzePipeline", lambda: cls.bronze), \
+                patch.object(pipeline_flow, "SilverPipeline", lambda: cls.silver), \
+                patch.object(pipeline_flow, "LoadPipeline", cls.loader_cls), \
+                patch.object(pipeline_flow, "_get_project_root", lambda: Path(".")), \
+                patch.object(
+                    pipeline_flow,
+                    "transform_entity",
+                    pipeline_flow.transform_entity.with_options(retries=0),
+                ):
+            pipeline_flow.main()
+
+    def test_every_endpoint_extracted(self):
+        """Each endpoint gets its own extraction."""
+        self.assertEqual(set(self.bronze.extracted), set(ENDPOINTS))
+
+    def test_transforms_wait_for_their_sources(self):
+        """A silver entity starts only after the bronze entities it reads."""
+        expected = set(SilverLayerManager.DIMENSIONS) | set(SilverLayerManager.FACTS)
+        self.assertEqual(set(self.silver.transformed), expected)
+
+        for name, (started, _) in self.silver.transformed.items():
+            for source in SilverLayerManager.SOURCES[name]:
+                with self.subTest(entity=name, source=source):
+                    self.assertLess(self.bronze.extracted[source], started)
+
+    def test_single_data_carga_per_run(self):
+        """Every transform sees the same data_carga, cleared after the run."""
+        stamps = {data_carga for _, data_carga in self.silver.transformed.values()}
+        self.assertEqual(len(stamps), 1)
+        self.assertIsNotNone(stamps.pop())
+        self.assertIsNone(self.silver.manager.data_carga)
+
+    def test_failed_transform_does_not_block_load(self):
+        """The load runs even though one transform failed."""
+        self.loader_cls.return_value.load_all.assert_called_once()
+        self.loader_cls.return_value.close.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()